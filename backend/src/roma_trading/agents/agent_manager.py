@@ -222,6 +222,7 @@ class AgentManager:
                     "account_id": account.get("account_id"),
                     "testnet": account.get("testnet", False),
                     "hedge_mode": account.get("hedge_mode", False),
+                    "use_websocket": account.get("use_websocket", False),
                 })
             else:
                 logger.error(f"Unsupported dex_type '{dex_type}' for account {account_id}")
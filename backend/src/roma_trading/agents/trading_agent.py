@@ -86,6 +86,7 @@ class TradingAgent:
                 account_id=exchange_cfg.get("account_id"),
                 testnet=exchange_cfg.get("testnet", False),
                 hedge_mode=exchange_cfg.get("hedge_mode", False),
+                use_websocket=exchange_cfg.get("use_websocket", False),
             )
             logger.info(f"TradingAgent {agent_id}: using Hyperliquid toolkit")
         else:
@@ -218,7 +219,7 @@ class TradingAgent:
             try:
                 await self.trading_cycle()
             except Exception as e:
-                logger.error(f"Error in trading cycle: {e}", exc_info=True)
+                logger.error(f"Error in trading cycle: {e}")
             
             await asyncio.sleep(scan_interval)
 
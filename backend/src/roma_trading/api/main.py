@@ -94,9 +94,9 @@ async def lifespan(app: FastAPI):
             else:
                 logger.info("Trade history analysis is disabled")
         except Exception as e:
-            logger.error(f"Failed to initialize trade history analysis: {e}", exc_info=True)
+            logger.error(f"Failed to initialize trade history analysis: {e}")
     except Exception as e:
-        logger.error(f"Failed to start agents: {e}", exc_info=True)
+        logger.error(f"Failed to start agents: {e}")
     
     yield
     
@@ -387,7 +387,7 @@ async def websocket_endpoint(websocket: WebSocket, agent_id: str):
         logger.error(f"Agent not found: {e}")
         await websocket.close(code=1008, reason=str(e))
     except Exception as e:
-        logger.error(f"WebSocket error: {e}", exc_info=True)
+        logger.error(f"WebSocket error: {e}")
         await websocket.close(code=1011, reason="Internal error")
 
 
@@ -481,7 +481,7 @@ async def admin_close_position(
             quantity_pct=normalized.quantity_pct,
         )
     except Exception as exc:
-        logger.error(f"Failed to close position {normalized.symbol} for {agent_id}: {exc}", exc_info=True)
+        logger.error(f"Failed to close position {normalized.symbol} for {agent_id}: {exc}")
         raise HTTPException(status_code=500, detail=str(exc))
 
     if not result:
@@ -663,7 +663,7 @@ async def chat_with_ai(
         logger.error(f"Chat service error: {e}")
         raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
-        logger.error(f"Failed to process chat message: {e}", exc_info=True)
+        logger.error(f"Failed to process chat message: {e}")
         raise HTTPException(status_code=500, detail="Failed to process chat message")
 
 
@@ -61,7 +61,7 @@ class AnalysisScheduler:
                 try:
                     await self._run_scheduled_analyses()
                 except Exception as e:
-                    logger.error(f"Failed to run initial analysis: {e}", exc_info=True)
+                    logger.error(f"Failed to run initial analysis: {e}")
             
             # Run initial analysis in background
             asyncio.create_task(run_initial_analysis())
@@ -91,7 +91,7 @@ class AnalysisScheduler:
             except asyncio.CancelledError:
                 break
             except Exception as e:
-                logger.error(f"Error in analysis scheduler loop: {e}", exc_info=True)
+                logger.error(f"Error in analysis scheduler loop: {e}")
                 # Wait a bit before retrying
                 await asyncio.sleep(60)
     
@@ -149,7 +149,7 @@ class AnalysisScheduler:
                 # This is expected when there aren't enough trades
                 logger.info(f"ℹ️ Skipping analysis for {agent_id}: {e}")
             except Exception as e:
-                logger.error(f"❌ Failed to run analysis for {agent_id}: {e}", exc_info=True)
+                logger.error(f"❌ Failed to run analysis for {agent_id}: {e}")
         
         # Also run global analysis (aggregate across all agents)
         # Note: Global analysis is currently not fully implemented
@@ -226,7 +226,7 @@ class ChatService:
             )
                 
         except Exception as e:
-            logger.error(f"Error in chat service: {e}", exc_info=True)
+            logger.error(f"Error in chat service: {e}")
             raise
 
     async def _handle_token_analysis(
@@ -261,7 +261,7 @@ class ChatService:
                 error_msg = f"Sorry, I couldn't find token {symbol}. This token may not be available on the current exchange, or the symbol may be incorrect. Please check the token symbol and try again."
             return error_msg
         except Exception as e:
-            logger.error(f"Token analysis failed for {symbol}: {e}", exc_info=True)
+            logger.error(f"Token analysis failed for {symbol}: {e}")
             # Fallback to general chat with error message
             if language == "zh":
                 error_msg = f"分析 {symbol} 时遇到错误：{str(e)}。请稍后重试或检查代币符号是否正确。"
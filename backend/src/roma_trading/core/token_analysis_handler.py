@@ -5,84 +5,196 @@ Handles token-specific analysis requests and generates comprehensive
 market analysis with trading recommendations.
 """
 
+import asyncio
+import io
 import re
-from typing import Optional, Dict, List
+import time
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Dict, List, NoReturn, Optional, Tuple
 from loguru import logger
 from roma_trading.agents import AgentManager
 from roma_trading.toolkits.technical_analysis import TechnicalAnalysisToolkit
 
 
+# Supported token symbols mapping
+TOKEN_MAPPING = {
+    # Full names to symbols (English)
+    "bitcoin": "BTCUSDT",
+    "ethereum": "ETHUSDT",
+    "solana": "SOLUSDT",
+    "binance": "BNBUSDT",
+    "doge": "DOGEUSDT",
+    "dogecoin": "DOGEUSDT",
+    "ripple": "XRPUSDT",
+    "xrp": "XRPUSDT",
+    # Symbols
+    "btc": "BTCUSDT",
+    "eth": "ETHUSDT",
+    "sol": "SOLUSDT",
+    "bnb": "BNBUSDT",
+    # Chinese names
+    "比特币": "BTCUSDT",
+    "以太坊": "ETHUSDT",
+    "以太币": "ETHUSDT",
+    "索拉纳": "SOLUSDT",
+    "币安币": "BNBUSDT",
+    "狗狗币": "DOGEUSDT",
+    "瑞波币": "XRPUSDT",
+}
+
+# Keywords that indicate analysis request (English and Chinese)
+_ANALYSIS_KEYWORDS_EN = (
+    "analyze", "analysis",
+    "what about", "how about",
+    "should i", "can i",
+    "buy", "sell", "trade",
+    "price", "trend", "signal",
+    "recommendation", "advice",
+    "what should", "what to do",
+)
+_ANALYSIS_KEYWORDS_ZH = (
+    "分析", "怎么操作", "如何操作",
+    "应该", "建议", "推荐",
+    "买入", "卖出", "交易",
+    "价格", "趋势", "信号",
+    "操作", "怎么办",
+)
+
+
+def _minimal_keywords(keywords) -> List[str]:
+    """
+    Drop duplicate keywords and keywords that contain another keyword.
+    
+    A substring match on the shorter keyword already covers the longer one
+    (e.g. "操作" covers "怎么操作"), so the result matches exactly the same messages.
+    """
+    unique = sorted(set(keywords), key=lambda keyword: (len(keyword), keyword))
+    minimal: List[str] = []
+    for keyword in unique:
+        if not any(shorter in keyword for shorter in minimal):
+            minimal.append(keyword)
+    return minimal
+
+
+_ANALYSIS_KW_RE_EN = re.compile("|".join(map(re.escape, _minimal_keywords(_ANALYSIS_KEYWORDS_EN))))
+_ANALYSIS_KW_RE_ZH = re.compile("|".join(map(re.escape, _minimal_keywords(_ANALYSIS_KEYWORDS_ZH))))
+
+# Common English words that are not tokens
+_EXCLUDED_WORDS = frozenset({
+    "USDT", "USD", "THE", "AND", "FOR", "ARE", "BUT", "NOT", "YOU", "ALL", "CAN",
+    "HER", "WAS", "ONE", "OUR", "OUT", "DAY", "GET", "HAS", "HIM", "HIS", "HOW",
+    "ITS", "MAY", "NEW", "NOW", "OLD", "SEE", "TWO", "WHO", "BOY", "DID", "LET",
+    "PUT", "SAY", "SHE", "TOO", "USE", "WHY", "YES", "YET", "ANY", "ASK", "BUY",
+    "SELL", "TRADE", "PRICE", "TREND", "SIGNAL", "ABOUT", "SHOULD", "WHAT", "WHEN",
+    "WHERE", "WHICH", "ANALYZE", "ANALYSIS",
+})
+
+# Excluded words bucketed by length; candidates of other lengths skip the set probe
+_EXCLUDED_BY_LEN: Dict[int, frozenset] = {
+    length: frozenset(word for word in _EXCLUDED_WORDS if len(word) == length)
+    for length in {len(word) for word in _EXCLUDED_WORDS}
+}
+
+_SYMBOL_NOT_FOUND_RE = re.compile(r"not found|symbol", re.IGNORECASE)
+
+# Prompt headers per language: (title, current price label, timeframe label)
+_LANG_HEADERS = {
+    "zh": ("市场数据分析", "当前价格", "时间框架"),
+    "en": ("Market Data Analysis", "Current Price", "Timeframe"),
+}
+
+# Market data cache: concurrent chats about the same token share one upstream call
+_PRICE_CACHE_TTL = 10.0  # seconds
+_KLINES_CACHE_TTL = 30.0  # seconds
+_MARKET_CACHE_MAX_ENTRIES = 1024
+
+# Single scan over the upper-cased message: full symbols such as "BTCUSDT"
+# (group 1) or bare token codes of 2-6 letters such as "MON" (group 2)
+_TOKEN_SCAN_RE = re.compile(r'\b(?:([A-Z]{2,10}USDT)|([A-Z]{2,6}))\b')
+
+
+@lru_cache(maxsize=4096)
+def _detect_analysis_request(message: str) -> bool:
+    """Pure keyword check behind TokenAnalysisHandler.detect_analysis_request."""
+    message_lower = message.lower()
+    if _ANALYSIS_KW_RE_EN.search(message_lower):
+        return True
+    # Chinese keywords cannot occur in a pure-ASCII message
+    return not message_lower.isascii() and _ANALYSIS_KW_RE_ZH.search(message_lower) is not None
+
+
+@lru_cache(maxsize=4096)
+def _extract_token_symbol(message: str) -> Optional[str]:
+    """Pure symbol extraction behind TokenAnalysisHandler.extract_token_symbol."""
+    # A full symbol (e.g., "BTCUSDT", "MONUSDT") anywhere wins outright; otherwise
+    # remember the first token code that is not a common English word
+    first_code = None
+    for full_symbol, code in _TOKEN_SCAN_RE.findall(message.upper()):
+        if full_symbol:
+            return full_symbol
+        if first_code is None and code not in _EXCLUDED_BY_LEN.get(len(code), ()):
+            first_code = code
+    
+    # Check token mapping (predefined tokens with names)
+    message_lower = message.lower()
+    for token_name, symbol in TOKEN_MAPPING.items():
+        if token_name in message_lower:
+            return symbol
+    
+    # Known codes (BTC, ETH, ...) and arbitrary ones (MON, PEPE, ...) alike are
+    # paired with USDT; the DEX API will validate if the token exists
+    if first_code is not None:
+        return f"{first_code}USDT"
+    
+    return None
+
+
+def _raise_price_fetch_error(symbol: str, error: Exception) -> NoReturn:
+    """Re-raise a failed price fetch as the exception surfaced to the chat service."""
+    if isinstance(error, ValueError):
+        # Symbol not found on exchange
+        if _SYMBOL_NOT_FOUND_RE.search(str(error)):
+            raise ValueError(f"Token {symbol} is not available on this exchange. Please check if the symbol is correct.") from error
+        raise error
+    logger.error(f"Failed to fetch price for {symbol}: {error}")
+    raise RuntimeError(f"Failed to fetch price for {symbol}: {error}") from error
+
+
 class TokenAnalysisHandler:
     """Handles token analysis requests in chat."""
     
-    # Supported token symbols mapping
-    TOKEN_MAPPING = {
-        # Full names to symbols (English)
-        "bitcoin": "BTCUSDT",
-        "ethereum": "ETHUSDT",
-        "solana": "SOLUSDT",
-        "binance": "BNBUSDT",
-        "doge": "DOGEUSDT",
-        "dogecoin": "DOGEUSDT",
-        "ripple": "XRPUSDT",
-        "xrp": "XRPUSDT",
-        # Symbols
-        "btc": "BTCUSDT",
-        "eth": "ETHUSDT",
-        "sol": "SOLUSDT",
-        "bnb": "BNBUSDT",
-        "doge": "DOGEUSDT",
-        "xrp": "XRPUSDT",
-        # Chinese names
-        "比特币": "BTCUSDT",
-        "以太坊": "ETHUSDT",
-        "以太币": "ETHUSDT",
-        "索拉纳": "SOLUSDT",
-        "币安币": "BNBUSDT",
-        "狗狗币": "DOGEUSDT",
-        "瑞波币": "XRPUSDT",
-    }
+    TOKEN_MAPPING = TOKEN_MAPPING
     
     def __init__(self, agent_manager: AgentManager):
         self.agent_manager = agent_manager
         self.ta_toolkit = TechnicalAnalysisToolkit()
+        self._dex_agent_id: Optional[str] = None
+        self._dex_agent = None
+        self._dex = None
+        
+        # key -> (expires_at, value), plus in-flight fetches for single-flight
+        self._market_cache: Dict[Tuple, Tuple[float, Any]] = {}
+        self._market_inflight: Dict[Tuple, asyncio.Future] = {}
     
     def detect_analysis_request(self, message: str) -> bool:
         """
         Detect if user message requests token analysis.
         
+        Results are memoized by message content.
+        
         Args:
             message: User's message
             
         Returns:
             True if analysis is requested
         """
-        message_lower = message.lower()
-        
-        # Keywords that indicate analysis request (English and Chinese)
-        analysis_keywords = [
-            # English
-            "analyze", "analysis", "analyze",
-            "what about", "how about",
-            "should i", "can i",
-            "buy", "sell", "trade",
-            "price", "trend", "signal",
-            "recommendation", "advice",
-            "what should", "what to do",
-            # Chinese
-            "分析", "怎么操作", "如何操作",
-            "应该", "建议", "推荐",
-            "买入", "卖出", "交易",
-            "价格", "趋势", "信号",
-            "操作", "怎么办"
-        ]
-        
-        return any(keyword in message_lower for keyword in analysis_keywords)
+        return _detect_analysis_request(message)
     
     def extract_token_symbol(self, message: str) -> Optional[str]:
         """
         Extract token symbol from user message.
         Supports both predefined tokens and arbitrary tokens (e.g., MON -> MONUSDT).
+        Results are memoized by message content.
         
         Args:
             message: User's message
@@ -90,53 +202,68 @@ class TokenAnalysisHandler:
         Returns:
             Token symbol (e.g., "BTCUSDT", "MONUSDT") or None
         """
-        message_lower = message.lower()
-        message_upper = message.upper()
-        
-        # Check for full symbol (e.g., "BTCUSDT", "MONUSDT")
-        symbol_pattern = r'\b([A-Z]{2,10}USDT)\b'
-        match = re.search(symbol_pattern, message_upper)
-        if match:
-            return match.group(1)
-        
-        # Check token mapping (predefined tokens with names)
-        for token_name, symbol in self.TOKEN_MAPPING.items():
-            if token_name in message_lower:
-                return symbol
-        
-        # Try to find token codes (2-6 uppercase letters, not just predefined ones)
-        # This allows arbitrary tokens like MON, PEPE, etc.
-        # Token codes are typically 2-6 characters, all uppercase
-        token_pattern = r'\b([A-Z]{2,6})\b'
-        matches = re.findall(token_pattern, message_upper)
-        
-        # Filter out common English words that are not tokens
-        excluded_words = {
-            "USDT", "USD", "THE", "AND", "FOR", "ARE", "BUT", "NOT", "YOU", "ALL", "CAN",
-            "HER", "WAS", "ONE", "OUR", "OUT", "DAY", "GET", "HAS", "HIM", "HIS", "HOW",
-            "ITS", "MAY", "NEW", "NOW", "OLD", "SEE", "TWO", "WHO", "BOY", "DID", "LET",
-            "PUT", "SAY", "SHE", "TOO", "USE", "WHY", "YES", "YET", "ANY", "ASK", "BUY",
-            "SELL", "TRADE", "PRICE", "TREND", "SIGNAL", "ABOUT", "SHOULD", "WHAT", "WHEN",
-            "WHERE", "WHICH", "ANALYZE", "ANALYSIS"
-        }
+        return _extract_token_symbol(message)
+    
+    def _get_dex(self):
+        """
+        Return the DEX toolkit of the first agent, resolving it only once.
         
-        for match in matches:
-            # Skip if it's an excluded word
-            if match in excluded_words:
-                continue
+        The cached handle is dropped when the agent it came from is no longer
+        registered (e.g. after AgentManager.reload_agents()).
+        """
+        agents = self.agent_manager.agents
+        if self._dex is not None and agents.get(self._dex_agent_id) is self._dex_agent:
+            return self._dex
+        
+        # Get any agent to access DEX
+        if not agents:
+            raise RuntimeError("No agents available for data access")
+        
+        agent_id, agent = next(iter(agents.items()))
+        self._dex_agent_id = agent_id
+        self._dex_agent = agent
+        self._dex = agent.dex
+        self._market_cache.clear()
+        return self._dex
+    
+    async def _cached_fetch(
+        self,
+        key: Tuple,
+        ttl: float,
+        fetch: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        """
+        Return a cached market data value, fetching it at most once per TTL.
+        
+        Concurrent misses for the same key await a single upstream call.
+        Failures are not cached.
+        """
+        entry = self._market_cache.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            return entry[1]
+        
+        task = self._market_inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fetch())
+            self._market_inflight[key] = task
             
-            # If it's a known token from our mapping, return it
-            if match in ["BTC", "ETH", "SOL", "BNB", "DOGE", "XRP"]:
-                return f"{match}USDT"
+            def _on_done(t: asyncio.Future) -> None:
+                self._market_inflight.pop(key, None)
+                if t.cancelled() or t.exception() is not None:
+                    return
+                cache = self._market_cache
+                if len(cache) >= _MARKET_CACHE_MAX_ENTRIES:
+                    now = time.monotonic()
+                    for stale_key in [k for k, (expires_at, _) in cache.items() if expires_at <= now]:
+                        del cache[stale_key]
+                    if len(cache) >= _MARKET_CACHE_MAX_ENTRIES:
+                        del cache[next(iter(cache))]
+                cache[key] = (time.monotonic() + ttl, t.result())
             
-            # For other uppercase codes (2-6 chars), assume it's a token and append USDT
-            # This allows users to query arbitrary tokens like MON, PEPE, etc.
-            # The DEX API will validate if the token exists
-            # Token codes are typically 2-6 characters, all uppercase letters
-            if 2 <= len(match) <= 6 and match.isalpha():
-                return f"{match}USDT"
-        
-        return None
+            task.add_done_callback(_on_done)
+        
+        # Shield so one cancelled caller does not cancel the shared fetch
+        return await asyncio.shield(task)
     
     async def fetch_token_data(
         self, 
@@ -156,43 +283,57 @@ class TokenAnalysisHandler:
         if timeframes is None:
             timeframes = ["3m", "1h", "4h"]
         
-        # Get any agent to access DEX
-        agents = self.agent_manager.get_all_agents()
-        if not agents:
-            raise RuntimeError("No agents available for data access")
+        dex = self._get_dex()
+        
+        # Fetch current price and K-line data for all timeframes concurrently
+        current_price, *klines_results = await asyncio.gather(
+            self._cached_fetch(
+                ("price", symbol),
+                _PRICE_CACHE_TTL,
+                lambda: dex.get_market_price(symbol),
+            ),
+            *(
+                self._cached_fetch(
+                    ("klines", symbol, timeframe),
+                    _KLINES_CACHE_TTL,
+                    lambda timeframe=timeframe: dex.get_klines(symbol, interval=timeframe, limit=100),
+                )
+                for timeframe in timeframes
+            ),
+            return_exceptions=True,
+        )
+        
+        if isinstance(current_price, Exception):
+            _raise_price_fetch_error(symbol, current_price)
         
-        agent = self.agent_manager.get_agent(agents[0]["id"])
-        dex = agent.dex
-        
-        # Fetch current price
-        try:
-            current_price = await dex.get_market_price(symbol)
-        except ValueError as e:
-            # Symbol not found on exchange
-            error_msg = str(e)
-            if "not found" in error_msg.lower() or "symbol" in error_msg.lower():
-                raise ValueError(f"Token {symbol} is not available on this exchange. Please check if the symbol is correct.")
-            raise
-        except Exception as e:
-            logger.error(f"Failed to fetch price for {symbol}: {e}")
-            raise RuntimeError(f"Failed to fetch price for {symbol}: {e}")
-        
-        # Fetch K-line data for each timeframe
         analysis_data = {}
+        valid_pairs = []
         
-        for timeframe in timeframes:
-            try:
-                klines = await dex.get_klines(symbol, interval=timeframe, limit=100)
-                
-                if klines and len(klines) >= 50:
-                    analysis = self.ta_toolkit.analyze_klines(klines, interval=timeframe)
-                    analysis_data[timeframe] = analysis
-                else:
-                    logger.warning(f"Insufficient data for {symbol} {timeframe}: {len(klines) if klines else 0} candles")
-                    analysis_data[timeframe] = None
-            except Exception as e:
-                logger.error(f"Failed to fetch {timeframe} data for {symbol}: {e}")
+        for timeframe, klines in zip(timeframes, klines_results):
+            if isinstance(klines, Exception):
+                logger.error(f"Failed to fetch {timeframe} data for {symbol}: {klines}")
                 analysis_data[timeframe] = None
+            elif klines and len(klines) >= 50:
+                analysis_data[timeframe] = None
+                valid_pairs.append((timeframe, klines))
+            else:
+                logger.warning(f"Insufficient data for {symbol} {timeframe}: {len(klines) if klines else 0} candles")
+                analysis_data[timeframe] = None
+        
+        # Indicator math is CPU-bound; keep it off the event loop
+        analyses = await asyncio.gather(
+            *(
+                asyncio.to_thread(self.ta_toolkit.analyze_klines, klines, interval=timeframe)
+                for timeframe, klines in valid_pairs
+            ),
+            return_exceptions=True,
+        )
+        
+        for (timeframe, _), analysis in zip(valid_pairs, analyses):
+            if isinstance(analysis, Exception):
+                logger.error(f"Failed to analyze {timeframe} data for {symbol}: {analysis}")
+                continue
+            analysis_data[timeframe] = analysis
         
         return {
             "symbol": symbol,
@@ -219,34 +360,17 @@ class TokenAnalysisHandler:
         current_price = token_data["current_price"]
         analysis = token_data["analysis"]
         
-        lines = []
+        if language not in _LANG_HEADERS:
+            language = "en"
+        title, price_label, timeframe_label = _LANG_HEADERS[language]
         
-        if language == "zh":
-            lines.append(f"## {symbol} 市场数据分析")
-            lines.append(f"\n当前价格: ${current_price:.4f}")
-            
-            # Add analysis for each timeframe
-            for timeframe, data in analysis.items():
-                if data is None:
-                    continue
-                
-                lines.append(f"\n### {timeframe} 时间框架")
-                lines.append(self.ta_toolkit.format_market_data(
-                    symbol, data, language="zh"
-                ))
-        else:
-            lines.append(f"## {symbol} Market Data Analysis")
-            lines.append(f"\nCurrent Price: ${current_price:.4f}")
-            
-            # Add analysis for each timeframe
-            for timeframe, data in analysis.items():
-                if data is None:
-                    continue
-                
-                lines.append(f"\n### {timeframe} Timeframe")
-                lines.append(self.ta_toolkit.format_market_data(
-                    symbol, data, language="en"
-                ))
-        
-        return "\n".join(lines)
-
+        format_market_data = self.ta_toolkit.format_market_data
+        buf = io.StringIO()
+        write = buf.write
+        write(f"## {symbol} {title}\n\n{price_label}: ${current_price:.4f}")
+        for timeframe, data in analysis.items():
+            if data is None:
+                continue
+            write(f"\n\n### {timeframe} {timeframe_label}\n")
+            write(format_market_data(symbol, data, language=language))
+        return buf.getvalue()
@@ -6,17 +6,40 @@ that improve future trading decisions.
 """
 
 import json
+import os
 import asyncio
+import bisect
+import re
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, List, Optional, Any
-from dataclasses import dataclass, asdict
+from typing import Dict, Iterator, List, Optional, Tuple, Any
+from dataclasses import dataclass, fields
 from enum import Enum
+from functools import lru_cache
+from operator import itemgetter
 import uuid
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import orjson
 import yaml
 
 from loguru import logger
 
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader as _YamlLoader
+
+
+def _shallow_asdict(obj: Any) -> Dict:
+    """
+    Top-level dataclass fields as a dict.
+    
+    Unlike dataclasses.asdict, nested lists and dicts are shared rather than
+    deep-copied; to_dict results are only used for immediate serialization.
+    """
+    return {f.name: getattr(obj, f.name) for f in fields(obj)}
+
 
 class InsightCategory(str, Enum):
     """Categories of trading insights."""
@@ -28,7 +51,82 @@ class InsightCategory(str, Enum):
     LEVERAGE_USAGE = "leverage_usage"
 
 
-@dataclass
+# Direct value -> member lookup, avoiding Enum.__call__ per decoded insight
+_CAT_BY_VALUE: Dict[str, InsightCategory] = {c.value: c for c in InsightCategory}
+
+# Placeholders filled into the trade analysis prompt template
+_ANALYSIS_PLACEHOLDER_RE = re.compile(r"\{(TRADE_SUMMARY|WIN_RATE|PROFIT_FACTOR|AVG_PNL)\}")
+
+# Patterns for extracting and repairing the insights JSON in LLM responses
+_RE_CODE_BLOCK = re.compile(r'```(?:json)?\s*(\{.*?\})\s*```', re.DOTALL)
+_RE_INSIGHTS_OBJ = re.compile(r'\{[^{}]*"insights"[^{}]*\[.*?\]\s*\}', re.DOTALL)
+_RE_INSIGHTS_FALLBACK = re.compile(r'\{.*"insights".*\[.*?\].*?\}', re.DOTALL)
+_RE_MD_OPEN = re.compile(r'^```(?:json)?\s*')
+_RE_MD_CLOSE = re.compile(r'\s*```$')
+_RE_TRAILING_OBJ = re.compile(r',\s*}')
+_RE_TRAILING_ARR = re.compile(r',\s*]')
+_RE_ARRAY = re.compile(r'\[.*?\]', re.DOTALL)
+_RE_INSIGHTS_ARRAY_START = re.compile(r'"insights"\s*:\s*\[')
+_RE_ARRAY_SEPARATOR = re.compile(r'[\s,]*')
+
+
+def _json_repair_candidates(json_str: str) -> Iterator[str]:
+    """Yield json_str as-is, then with trailing commas and/or single quotes fixed."""
+    yield json_str
+    yield _RE_TRAILING_OBJ.sub('}', _RE_TRAILING_ARR.sub(']', json_str))
+    double_quoted = json_str.replace("'", '"')
+    yield double_quoted
+    yield _RE_TRAILING_OBJ.sub('}', _RE_TRAILING_ARR.sub(']', double_quoted))
+
+
+def _json_loads(data: Any) -> Any:
+    """Decode JSON with orjson, falling back to json for input it rejects (NaN, huge ints)."""
+    try:
+        return orjson.loads(data)
+    except orjson.JSONDecodeError:
+        return json.loads(data)
+
+
+def _salvage_insights(text: str) -> List[Any]:
+    """
+    Decode the complete elements of the "insights" array in a JSON text.
+    
+    Elements before a truncation point are kept even if the text is cut off
+    before the array closes.
+    """
+    start = _RE_INSIGHTS_ARRAY_START.search(text)
+    if not start:
+        return []
+    
+    decoder = json.JSONDecoder()
+    items = []
+    pos = start.end()
+    while True:
+        pos = _RE_ARRAY_SEPARATOR.match(text, pos).end()
+        if pos >= len(text) or text[pos] == "]":
+            break
+        try:
+            item, pos = decoder.raw_decode(text, pos)
+        except json.JSONDecodeError:
+            # Incomplete (or malformed) element; nothing usable follows
+            break
+        items.append(item)
+    return items
+
+
+# Defaults for the optional fields of an LLM insight object. The sequences are
+# tuples so no list is shared between insights; non-list values become fresh lists.
+_INSIGHT_DEFAULTS: Dict[str, Any] = {
+    "category": "entry_timing",
+    "title": "Untitled Insight",
+    "summary": "",
+    "detailed_findings": "",
+    "recommendations": (),
+    "confidence_score": 0.7,
+    "supporting_trade_ids": (),
+}
+
+@dataclass(slots=True)
 class TradeHistory:
     """Enhanced trade history record with analysis context."""
     trade_id: str
@@ -60,7 +158,7 @@ class TradeHistory:
     
     def to_dict(self) -> Dict:
         """Convert to dictionary for JSON serialization."""
-        result = asdict(self)
+        result = _shallow_asdict(self)
         result["entry_time"] = self.entry_time.isoformat()
         result["exit_time"] = self.exit_time.isoformat()
         return result
@@ -95,7 +193,7 @@ class AnalysisInsight:
     
     def to_dict(self) -> Dict:
         """Convert to dictionary for JSON serialization."""
-        result = asdict(self)
+        result = _shallow_asdict(self)
         result["category"] = self.category.value
         result["analysis_period_start"] = self.analysis_period_start.isoformat()
         result["analysis_period_end"] = self.analysis_period_end.isoformat()
@@ -125,7 +223,7 @@ class AnalysisSnapshot:
     
     # Statistics
     win_rate: float
-    profit_factor: float
+    profit_factor: Optional[float]  # None when no losing trades
     avg_pnl: float
     total_pnl: float
     
@@ -138,7 +236,7 @@ class AnalysisSnapshot:
     
     def to_dict(self) -> Dict:
         """Convert to dictionary for JSON serialization."""
-        result = asdict(self)
+        result = _shallow_asdict(self)
         result["created_at"] = self.created_at.isoformat()
         result["analysis_period_start"] = self.analysis_period_start.isoformat()
         result["analysis_period_end"] = self.analysis_period_end.isoformat()
@@ -175,18 +273,191 @@ class AnalysisJob:
     
     def to_dict(self) -> Dict:
         """Convert to dictionary for JSON serialization."""
-        result = asdict(self)
+        result = _shallow_asdict(self)
         result["scheduled_at"] = self.scheduled_at.isoformat()
         if self.started_at:
             result["started_at"] = self.started_at.isoformat()
         if self.completed_at:
             result["completed_at"] = self.completed_at.isoformat()
         return result
+    
+    @classmethod
+    def from_raw(cls, data: Dict) -> "AnalysisJob":
+        """Build a job from its to_dict() form as decoded from jobs.json."""
+        fromisoformat = datetime.fromisoformat
+        get = data.get
+        started_at = get("started_at")
+        completed_at = get("completed_at")
+        return cls(
+            job_id=data["job_id"],
+            agent_id=data["agent_id"],
+            status=data["status"],
+            scheduled_at=fromisoformat(data["scheduled_at"]),
+            started_at=fromisoformat(started_at) if started_at else None,
+            completed_at=fromisoformat(completed_at) if completed_at else None,
+            error_message=get("error_message"),
+            analysis_period_days=get("analysis_period_days", 30),
+            min_trades_required=get("min_trades_required", 10),
+            trades_analyzed=get("trades_analyzed", 0),
+            insights_generated=get("insights_generated", 0),
+            insight_ids=get("insight_ids"),
+            snapshot_id=get("snapshot_id"),
+        )
+
+
+# Datetime fields stored as ISO strings in each record type's JSON
+_INSIGHT_DT_FIELDS = ("created_at", "analysis_period_start", "analysis_period_end", "deprecated_at")
+_SNAPSHOT_DT_FIELDS = ("created_at", "analysis_period_start", "analysis_period_end", "last_trade_timestamp")
+
+
+def _is_zh_language(language: Optional[str]) -> bool:
+    """Whether a language code selects Chinese output; only the prefix is lowercased."""
+    return (language or "en")[:2].lower() == "zh"
+
+
+def _rehydrate_dt(data: Dict, fields: Tuple[str, ...]) -> Dict:
+    """Convert the given ISO string fields of a decoded record back to datetimes in place."""
+    fromisoformat = datetime.fromisoformat
+    for field in fields:
+        value = data.get(field)
+        if value:
+            data[field] = fromisoformat(value)
+    return data
+
+
+@dataclass(slots=True)
+class TradeStats:
+    """Summary statistics over a set of trades, computed once per analysis job."""
+    trade_count: int
+    n_win: int
+    n_loss: int
+    total_profit: float
+    total_loss: float
+    total_pnl: float
+    last_exit_time: Optional[datetime]
+    
+    @property
+    def win_rate(self) -> float:
+        return self.n_win / self.trade_count if self.trade_count else 0.0
+    
+    @property
+    def profit_factor(self) -> Optional[float]:
+        """Gross profit over gross loss; None when there are trades but no losses."""
+        if self.total_loss > 0:
+            return self.total_profit / self.total_loss
+        return None if self.trade_count else 0.0
+    
+    @property
+    def avg_pnl(self) -> float:
+        return self.total_pnl / self.trade_count if self.trade_count else 0.0
+    
+    @classmethod
+    def from_trades(
+        cls,
+        trades: List[TradeHistory],
+        arrays: Optional[Dict[str, np.ndarray]] = None,
+    ) -> "TradeStats":
+        """Compute win/loss counts, profit/loss totals and last exit time."""
+        if arrays is None:
+            arrays = TradeHistoryCollector.collect_trades_arrays(trades)
+        pnl = arrays["pnl_usdt"]
+        # Bucket each trade as loss (0), breakeven or NaN (1) or win (2); two
+        # bincounts give every count and sum without masked copies of the column
+        bucket = np.where(pnl > 0, 2, 1) - (pnl < 0)
+        counts = np.bincount(bucket, minlength=3)
+        sums = np.bincount(bucket, weights=pnl, minlength=3)
+        return cls(
+            trade_count=len(trades),
+            n_win=int(counts[2]),
+            n_loss=int(counts[0]),
+            total_profit=float(sums[2]),
+            total_loss=float(-sums[0]),
+            total_pnl=float(sums.sum()),
+            last_exit_time=max((t.exit_time for t in trades), default=None),
+        )
+
+
+def _top_pnl_indices(pnl: np.ndarray, mask: np.ndarray, n: int, largest: bool) -> np.ndarray:
+    """
+    Indices of the n largest (or smallest) pnl values among mask, ties in trade order.
+    
+    Same selection as sorted(..., key=pnl, reverse=largest)[:n] over the masked trades.
+    """
+    idx = np.flatnonzero(mask)
+    values = pnl[idx]
+    order = np.argsort(-values if largest else values, kind="stable")
+    return idx[order[:n]]
+
+
+def _symbol_stats(
+    trades: List[TradeHistory],
+    arrays: Optional[Dict[str, np.ndarray]] = None,
+) -> Dict[str, Tuple[int, int, int, float, float]]:
+    """
+    Per-symbol (count, wins, losses, sum_win, sum_loss), in first-seen symbol order.
+    
+    Symbols are encoded as integer ids and every aggregate is a bincount over
+    the pnl column, so there is no per-trade Python arithmetic.
+    """
+    if arrays is None:
+        arrays = TradeHistoryCollector.collect_trades_arrays(trades)
+    pnl = arrays["pnl_usdt"]
+    
+    symbol_ids: Dict[str, int] = {}
+    sid = np.fromiter(
+        (symbol_ids.setdefault(t.symbol, len(symbol_ids)) for t in trades),
+        dtype=np.intp, count=len(trades),
+    )
+    n_symbols = len(symbol_ids)
+    win_mask = pnl > 0
+    loss_mask = pnl < 0
+    
+    counts = np.bincount(sid, minlength=n_symbols)
+    wins = np.bincount(sid[win_mask], minlength=n_symbols)
+    losses = np.bincount(sid[loss_mask], minlength=n_symbols)
+    sum_win = np.bincount(sid[win_mask], weights=pnl[win_mask], minlength=n_symbols)
+    sum_loss = np.bincount(sid[loss_mask], weights=pnl[loss_mask], minlength=n_symbols)
+    
+    return {
+        symbol: (int(counts[i]), int(wins[i]), int(losses[i]), float(sum_win[i]), float(sum_loss[i]))
+        for symbol, i in symbol_ids.items()
+    }
+
+
+@lru_cache(maxsize=4096)
+def _parse_decision_log(path: str, mtime_ns: int) -> Dict:
+    """
+    Parse a decision log file, memoized by path and modification time.
+    
+    Only the fields used for trade enrichment are kept so cached entries do not
+    hold on to the full chain of thought. Decisions and positions are indexed
+    by symbol, keeping the first entry for each symbol.
+    """
+    # json.dump may have written NaN/Infinity, which orjson rejects
+    log_data = _json_loads(Path(path).read_bytes())
+    timestamp = log_data.get("timestamp", "")
+    
+    decisions_by_symbol = {}
+    for decision in log_data.get("decisions", []):
+        decisions_by_symbol.setdefault(decision.get("symbol"), decision)
+    positions_by_symbol = {}
+    for pos in log_data.get("positions", []):
+        positions_by_symbol.setdefault(pos.get("symbol"), pos)
+    
+    return {
+        "timestamp": timestamp,
+        "_ts_epoch": datetime.fromisoformat(timestamp).timestamp(),
+        "_decisions_by_symbol": decisions_by_symbol,
+        "_positions_by_symbol": positions_by_symbol,
+    }
 
 
 class TradeHistoryCollector:
     """Collects and enriches trade history from DecisionLogger."""
     
+    # Worker threads used to read decision log files
+    LOAD_WORKERS = 8
+    
     def __init__(self, log_dir: str = "logs/decisions"):
         self.log_dir = Path(log_dir)
         self.log_dir.mkdir(parents=True, exist_ok=True)
@@ -218,9 +489,10 @@ class TradeHistoryCollector:
             f"filtering from {start_date.isoformat()} to {end_date.isoformat()}"
         )
         
-        # Filter by date range
-        # Use <= for start (inclusive) and < for end (exclusive) to avoid edge cases
-        # But actually, we want to include trades that closed exactly at end_date
+        # Filter by close time, start_date and end_date both inclusive (with a
+        # 1 second buffer on end_date), comparing epoch floats inside the loop
+        start_epoch = start_date.timestamp()
+        end_epoch = end_date.timestamp() + 1.0
         filtered_trades = []
         for trade in all_trades:
             try:
@@ -229,10 +501,8 @@ class TradeHistoryCollector:
                     logger.warning(f"Trade missing close_time: {trade.get('symbol', 'unknown')}")
                     continue
                 
-                close_time = datetime.fromisoformat(close_time_str)
-                # Include trades that closed between start_date (inclusive) and end_date (inclusive)
-                # Add 1 second buffer to end_date to include trades closed exactly at end_date
-                if start_date <= close_time <= (end_date + timedelta(seconds=1)):
+                close_epoch = datetime.fromisoformat(close_time_str).timestamp()
+                if start_epoch <= close_epoch <= end_epoch:
                     filtered_trades.append(trade)
             except (ValueError, KeyError) as e:
                 logger.warning(f"Failed to parse trade close_time: {e}, trade: {trade.get('symbol', 'unknown')}")
@@ -246,9 +516,12 @@ class TradeHistoryCollector:
         
         logger.debug(f"Loaded {len(decision_logs)} decision logs for enrichment")
         
+        # Sorted timestamps for binary search, built once for all trades
+        log_ts = [log["_ts_epoch"] for log in decision_logs]
+        
         enrichment_failures = 0
         for trade in filtered_trades:
-            enriched = self._enrich_trade(trade, decision_logs, agent_id)
+            enriched = self._enrich_trade(trade, decision_logs, agent_id, log_ts)
             if enriched:
                 enriched_trades.append(enriched)
             else:
@@ -268,6 +541,20 @@ class TradeHistoryCollector:
         
         return enriched_trades
     
+    @staticmethod
+    def collect_trades_arrays(trades: List[TradeHistory]) -> Dict[str, np.ndarray]:
+        """
+        Build column arrays (structure-of-arrays) for numeric trade analysis.
+        
+        Only the columns the statistics read are built.
+        
+        Returns:
+            Dict with the pnl_usdt array
+        """
+        return {
+            "pnl_usdt": np.fromiter((t.pnl_usdt for t in trades), dtype=np.float64, count=len(trades)),
+        }
+    
     def _load_decision_logs(
         self,
         agent_id: str,
@@ -279,63 +566,80 @@ class TradeHistoryCollector:
         if not agent_log_dir.exists():
             return []
         
-        logs = []
-        for log_file in agent_log_dir.glob("decision_*.json"):
+        start_epoch = start_date.timestamp()
+        end_epoch = end_date.timestamp()
+        
+        def load(log_file: Path) -> Optional[Dict]:
             try:
-                with open(log_file, "r") as f:
-                    log_data = json.load(f)
-                log_time = datetime.fromisoformat(log_data.get("timestamp", ""))
-                if start_date <= log_time <= end_date:
-                    logs.append(log_data)
+                stat = log_file.stat()
+                # A log is written after its timestamp, so an older file cannot be in range
+                if stat.st_mtime < start_epoch:
+                    return None
+                log_data = _parse_decision_log(str(log_file), stat.st_mtime_ns)
+                if start_epoch <= log_data["_ts_epoch"] <= end_epoch:
+                    return log_data
             except Exception as e:
                 logger.warning(f"Failed to load decision log {log_file}: {e}")
+            return None
         
-        return sorted(logs, key=lambda x: x.get("timestamp", ""))
+        log_files = list(agent_log_dir.glob("decision_*.json"))
+        if not log_files:
+            return []
+        
+        # Overlap the per-file stat/read syscalls; parsing stays memoized
+        with ThreadPoolExecutor(max_workers=min(self.LOAD_WORKERS, len(log_files))) as executor:
+            logs = [log for log in executor.map(load, log_files) if log is not None]
+        
+        return sorted(logs, key=lambda x: x["_ts_epoch"])
     
     def _enrich_trade(
         self,
         trade: Dict,
         decision_logs: List[Dict],
         agent_id: str,
+        log_ts: Optional[List[float]] = None,
     ) -> Optional[TradeHistory]:
-        """Enrich trade with market data and decision context."""
+        """
+        Enrich trade with market data and decision context.
+        
+        Args:
+            trade: Raw trade record from DecisionLogger
+            decision_logs: Decision logs sorted by timestamp
+            agent_id: Agent identifier
+            log_ts: Epoch timestamps of decision_logs (computed if not given)
+        """
         try:
             # Parse required fields
             entry_time = datetime.fromisoformat(trade.get("open_time", ""))
             exit_time = datetime.fromisoformat(trade.get("close_time", ""))
             holding_minutes = int((exit_time - entry_time).total_seconds() / 60)
+            entry_epoch = entry_time.timestamp()
             
             # Find decision log for entry
+            if log_ts is None:
+                log_ts = [log["_ts_epoch"] for log in decision_logs]
             entry_log = None
-            for log in decision_logs:
-                try:
-                    log_time = datetime.fromisoformat(log.get("timestamp", ""))
-                    # Find log closest to entry time
-                    if abs((log_time - entry_time).total_seconds()) < 3600:  # Within 1 hour
-                        entry_log = log
-                        break
-                except (ValueError, KeyError):
-                    continue
+            # First log within 1 hour of entry time
+            idx = bisect.bisect_right(log_ts, entry_epoch - 3600)
+            if idx < len(log_ts) and log_ts[idx] < entry_epoch + 3600:
+                entry_log = decision_logs[idx]
             
             # Extract market data and reasoning from decision log
             entry_market_data = {}
             entry_reasoning = ""
             
             if entry_log:
-                decisions = entry_log.get("decisions", [])
-                for decision in decisions:
-                    if decision.get("symbol") == trade.get("symbol"):
-                        entry_reasoning = decision.get("reasoning", "")
-                        break
+                symbol = trade.get("symbol")
+                decision = entry_log["_decisions_by_symbol"].get(symbol)
+                if decision is not None:
+                    entry_reasoning = decision.get("reasoning", "")
                 
-                positions = entry_log.get("positions", [])
-                for pos in positions:
-                    if pos.get("symbol") == trade.get("symbol"):
-                        entry_market_data = {
-                            "mark_price": pos.get("mark_price"),
-                            "leverage": pos.get("leverage"),
-                        }
-                        break
+                pos = entry_log["_positions_by_symbol"].get(symbol)
+                if pos is not None:
+                    entry_market_data = {
+                        "mark_price": pos.get("mark_price"),
+                        "leverage": pos.get("leverage"),
+                    }
             
             return TradeHistory(
                 trade_id=f"{agent_id}_{trade.get('symbol', 'unknown')}_{trade.get('open_time', '')}",
@@ -376,42 +680,30 @@ class SnapshotManager:
         analysis_job: AnalysisJob,
         trades: List[TradeHistory],
         insights: List[AnalysisInsight],
+        stats: Optional[TradeStats] = None,
     ) -> str:
-        """Create and save analysis snapshot."""
+        """Create and save analysis snapshot, reusing the job's stats when given."""
         snapshot_id = f"snap_{uuid.uuid4().hex[:12]}"
         
-        # Calculate statistics
-        if trades:
-            winning_trades = [t for t in trades if t.pnl_usdt > 0]
-            win_rate = len(winning_trades) / len(trades) if trades else 0.0
-            total_profit = sum(t.pnl_usdt for t in winning_trades)
-            total_loss = abs(sum(t.pnl_usdt for t in trades if t.pnl_usdt < 0))
-            profit_factor = total_profit / total_loss if total_loss > 0 else float("inf")
-            avg_pnl = sum(t.pnl_usdt for t in trades) / len(trades)
-            total_pnl = sum(t.pnl_usdt for t in trades)
-            last_trade_time = max(t.exit_time for t in trades)
-        else:
-            win_rate = 0.0
-            profit_factor = 0.0
-            avg_pnl = 0.0
-            total_pnl = 0.0
-            last_trade_time = datetime.now()
+        if stats is None:
+            stats = TradeStats.from_trades(trades)
         
+        now = datetime.now()
         snapshot = AnalysisSnapshot(
             snapshot_id=snapshot_id,
             agent_id=agent_id,
-            created_at=datetime.now(),
+            created_at=now,
             analysis_period_start=analysis_job.scheduled_at - timedelta(days=analysis_job.analysis_period_days),
             analysis_period_end=analysis_job.scheduled_at,
             total_trades=len(trades),
             analyzed_trade_ids=[t.trade_id for t in trades],
-            last_trade_timestamp=last_trade_time,
+            last_trade_timestamp=stats.last_exit_time or now,
             insights_generated=len(insights),
             insight_ids=[ins.insight_id for ins in insights],
-            win_rate=win_rate,
-            profit_factor=profit_factor,
-            avg_pnl=avg_pnl,
-            total_pnl=total_pnl,
+            win_rate=stats.win_rate,
+            profit_factor=stats.profit_factor,
+            avg_pnl=stats.avg_pnl,
+            total_pnl=stats.total_pnl,
             snapshot_state={
                 "trades_analyzed": len(trades),
                 "insights_generated": len(insights),
@@ -474,26 +766,18 @@ class SnapshotManager:
     async def _save_snapshot(self, snapshot: AnalysisSnapshot) -> None:
         """Save snapshot to disk."""
         snapshot_file = self._get_snapshot_file(snapshot.agent_id, latest=True)
-        with open(snapshot_file, "w") as f:
-            json.dump(snapshot.to_dict(), f, indent=2)
+        payload = orjson.dumps(snapshot.to_dict(), option=orjson.OPT_INDENT_2)
+        await asyncio.to_thread(snapshot_file.write_bytes, payload)
     
     async def _load_snapshot(self, snapshot_file: Path) -> Optional[AnalysisSnapshot]:
         """Load snapshot from disk."""
         try:
-            with open(snapshot_file, "r") as f:
-                data = json.load(f)
-            
-            # Reconstruct datetime fields
-            data["created_at"] = datetime.fromisoformat(data["created_at"])
-            data["analysis_period_start"] = datetime.fromisoformat(data["analysis_period_start"])
-            data["analysis_period_end"] = datetime.fromisoformat(data["analysis_period_end"])
-            data["last_trade_timestamp"] = datetime.fromisoformat(data["last_trade_timestamp"])
-            
-            # Reconstruct category enum
-            if "category" in data:
-                data["category"] = InsightCategory(data["category"])
-            
-            return AnalysisSnapshot(**{k: v for k, v in data.items() if k != "category"})
+            data = _rehydrate_dt(_json_loads(snapshot_file.read_bytes()), _SNAPSHOT_DT_FIELDS)
+            data.pop("category", None)
+            # Older snapshots stored an unbounded profit factor as Infinity
+            if data.get("profit_factor") == float("inf"):
+                data["profit_factor"] = None
+            return AnalysisSnapshot(**data)
         except Exception as e:
             logger.error(f"Failed to load snapshot {snapshot_file}: {e}")
             return None
@@ -507,67 +791,165 @@ class SnapshotManager:
 class InsightRepository:
     """Stores and retrieves analysis insights."""
     
+    # Per-agent index of insight metadata, so lookups only parse the insights returned
+    MANIFEST_FILE = "_manifest.jsonl"
+    
     def __init__(self, storage_dir: str = "logs/insights"):
         self.storage_dir = Path(storage_dir)
         self.storage_dir.mkdir(parents=True, exist_ok=True)
     
+    @staticmethod
+    def _manifest_entry(insight: AnalysisInsight) -> Dict:
+        """Metadata needed to filter and rank an insight without loading it."""
+        return {
+            "insight_id": insight.insight_id,
+            "created_at": insight.created_at.isoformat(),
+            "confidence_score": insight.confidence_score,
+            "is_active": insight.is_active,
+            "category": insight.category.value,
+        }
+    
+    def _append_manifest(self, agent_dir: Path, entries: List[Dict]) -> None:
+        """Append entries to an agent's manifest."""
+        with open(agent_dir / self.MANIFEST_FILE, "ab") as f:
+            f.write(b"".join(orjson.dumps(entry) + b"\n" for entry in entries))
+    
+    def _write_insights(self, insights: List[AnalysisInsight], skip_failures: bool = False) -> List[str]:
+        """
+        Write insight files and manifest entries synchronously (run in a worker thread).
+        
+        Args:
+            insights: Insights to write
+            skip_failures: Log and skip insights that fail to write instead of raising
+            
+        Returns:
+            IDs of the insights written
+        """
+        saved_ids = []
+        manifest_entries: Dict[Path, List[Dict]] = {}
+        for insight in insights:
+            try:
+                agent_dir = self.storage_dir / (insight.agent_id or "global")
+                if agent_dir not in manifest_entries:
+                    agent_dir.mkdir(parents=True, exist_ok=True)
+                    manifest_entries[agent_dir] = []
+                
+                insight_file = agent_dir / f"{insight.insight_id}.json"
+                insight_file.write_bytes(orjson.dumps(insight, option=orjson.OPT_INDENT_2))
+            except Exception as e:
+                if not skip_failures:
+                    raise
+                logger.error(f"Failed to save insight {insight.insight_id}: {e}")
+                continue
+            
+            manifest_entries[agent_dir].append(self._manifest_entry(insight))
+            saved_ids.append(insight.insight_id)
+            logger.debug(f"Saved insight {insight.insight_id}")
+        
+        for agent_dir, entries in manifest_entries.items():
+            if entries:
+                self._append_manifest(agent_dir, entries)
+        return saved_ids
+    
     async def save_insight(self, insight: AnalysisInsight) -> str:
         """Save insight and return insight_id."""
-        agent_dir = self.storage_dir / (insight.agent_id or "global")
-        agent_dir.mkdir(parents=True, exist_ok=True)
+        await asyncio.to_thread(self._write_insights, [insight])
+        return insight.insight_id
+    
+    async def save_insights_batch(self, insights: List[AnalysisInsight]) -> List[str]:
+        """
+        Save several insights in one worker-thread hop.
         
-        insight_file = agent_dir / f"{insight.insight_id}.json"
-        with open(insight_file, "w") as f:
-            json.dump(insight.to_dict(), f, indent=2)
+        A failed insight is logged and skipped so it does not lose the rest of
+        the batch; only the IDs actually saved are returned.
+        """
+        if not insights:
+            return []
+        return await asyncio.to_thread(self._write_insights, insights, True)
+    
+    @staticmethod
+    def _load_insight(insight_file: Path) -> AnalysisInsight:
+        """Load a single insight file."""
+        data = _rehydrate_dt(orjson.loads(insight_file.read_bytes()), _INSIGHT_DT_FIELDS)
         
-        logger.debug(f"Saved insight {insight.insight_id}")
-        return insight.insight_id
+        # Reconstruct category enum
+        data["category"] = _CAT_BY_VALUE[data["category"]]
+        
+        return AnalysisInsight(**data)
+    
+    def _read_manifest(self, agent_dir: Path) -> List[Dict]:
+        """
+        Return manifest entries for the insight files present in agent_dir.
+        
+        Insight files missing from the manifest (e.g. saved before it existed)
+        are loaded once and appended to it.
+        """
+        entries: Dict[str, Dict] = {}
+        manifest_file = agent_dir / self.MANIFEST_FILE
+        if manifest_file.exists():
+            for line in manifest_file.read_bytes().splitlines():
+                if not line.strip():
+                    continue
+                try:
+                    entry = orjson.loads(line)
+                    entries[entry["insight_id"]] = entry
+                except (orjson.JSONDecodeError, KeyError, TypeError) as e:
+                    logger.warning(f"Skipping malformed manifest line in {manifest_file}: {e}")
+        
+        file_ids = {insight_file.stem for insight_file in agent_dir.glob("*.json")}
+        
+        missing_entries = []
+        for insight_id in file_ids - entries.keys():
+            insight_file = agent_dir / f"{insight_id}.json"
+            try:
+                entry = self._manifest_entry(self._load_insight(insight_file))
+            except Exception as e:
+                logger.warning(f"Failed to load insight {insight_file}: {e}")
+                continue
+            entries[insight_id] = entry
+            missing_entries.append(entry)
+        if missing_entries:
+            self._append_manifest(agent_dir, missing_entries)
+        
+        return [entry for insight_id, entry in entries.items() if insight_id in file_ids]
     
     async def get_latest_insights(
         self,
         agent_id: Optional[str],
         limit: int = 10,
         min_confidence: float = 0.7,
+        category: Optional[InsightCategory] = None,
     ) -> List[AnalysisInsight]:
-        """Get most recent active insights."""
+        """Get most recent active insights, optionally restricted to one category."""
         agent_dir = self.storage_dir / (agent_id or "global")
         if not agent_dir.exists():
             return []
         
+        candidates = [
+            entry for entry in self._read_manifest(agent_dir)
+            if entry["is_active"]
+            and entry["confidence_score"] >= min_confidence
+            and (category is None or entry["category"] == category.value)
+        ]
+        
+        # Sort by recency, then confidence: two stable single-key sorts give the
+        # (created_at, confidence) order without building a key tuple per entry
+        fromisoformat = datetime.fromisoformat
+        candidates.sort(key=itemgetter("confidence_score"), reverse=True)
+        candidates.sort(key=lambda x: fromisoformat(x["created_at"]), reverse=True)
+        
+        # Only the insights being returned are loaded in full
         insights = []
-        for insight_file in agent_dir.glob("*.json"):
+        for entry in candidates:
+            if len(insights) >= limit:
+                break
+            insight_file = agent_dir / f"{entry['insight_id']}.json"
             try:
-                with open(insight_file, "r") as f:
-                    data = json.load(f)
-                
-                # Reconstruct datetime fields
-                data["created_at"] = datetime.fromisoformat(data["created_at"])
-                data["analysis_period_start"] = datetime.fromisoformat(data["analysis_period_start"])
-                data["analysis_period_end"] = datetime.fromisoformat(data["analysis_period_end"])
-                
-                if data.get("deprecated_at"):
-                    data["deprecated_at"] = datetime.fromisoformat(data["deprecated_at"])
-                
-                # Reconstruct category enum
-                data["category"] = InsightCategory(data["category"])
-                
-                insight = AnalysisInsight(**data)
-                
-                if (
-                    insight.is_active
-                    and insight.confidence_score >= min_confidence
-                ):
-                    insights.append(insight)
+                insights.append(self._load_insight(insight_file))
             except Exception as e:
                 logger.warning(f"Failed to load insight {insight_file}: {e}")
         
-        # Sort by recency and confidence
-        insights.sort(
-            key=lambda x: (x.created_at, x.confidence_score),
-            reverse=True
-        )
-        
-        return insights[:limit]
+        return insights
     
     async def get_insights_by_category(
         self,
@@ -576,9 +958,7 @@ class InsightRepository:
         limit: int = 10,
     ) -> List[AnalysisInsight]:
         """Get insights by category."""
-        all_insights = await self.get_latest_insights(agent_id, limit=1000)
-        filtered = [ins for ins in all_insights if ins.category == category]
-        return filtered[:limit]
+        return await self.get_latest_insights(agent_id, limit=limit, category=category)
 
 
 class AnalysisEngine:
@@ -616,26 +996,26 @@ class AnalysisEngine:
         analysis_period_start: datetime,
         analysis_period_end: datetime,
         language: str = "en",
+        min_trades: int = 10,
+        stats: Optional[TradeStats] = None,
     ) -> List[AnalysisInsight]:
         """
         Analyze trades and generate insights using AI.
+        
+        Returns no insights when there are fewer than min_trades trades, since
+        the statistics are not meaningful enough to spend an LLM call on.
         """
-        if not trades:
+        if not trades or len(trades) < min_trades:
             return []
         
         # Calculate summary statistics
-        winning_trades = [t for t in trades if t.pnl_usdt > 0]
-        losing_trades = [t for t in trades if t.pnl_usdt < 0]
-        win_rate = len(winning_trades) / len(trades) if trades else 0.0
-        
-        total_profit = sum(t.pnl_usdt for t in winning_trades)
-        total_loss = abs(sum(t.pnl_usdt for t in losing_trades))
-        profit_factor = total_profit / total_loss if total_loss > 0 else float("inf")
-        
-        avg_pnl = sum(t.pnl_usdt for t in trades) / len(trades)
-        
-        # Format trade summary for LLM
-        trade_summary = self._format_trade_summary(trades)
+        arrays = TradeHistoryCollector.collect_trades_arrays(trades)
+        if stats is None:
+            stats = TradeStats.from_trades(trades, arrays)
+        win_rate = stats.win_rate
+        # Without losing trades the profit factor is unbounded; shown as inf in prompts
+        profit_factor = stats.profit_factor if stats.profit_factor is not None else float("inf")
+        avg_pnl = stats.avg_pnl
         
         # Normalize language (default to English)
         prompt_language = (language or "en").lower()
@@ -655,8 +1035,12 @@ class AnalysisEngine:
                 profit_factor,
                 avg_pnl,
                 prompt_language,
+                arrays=arrays,
             )
         
+        # Format trade summary for LLM (not needed by the rule-based fallback)
+        trade_summary = self._format_trade_summary(trades, arrays)
+        
         # Generate analysis prompt
         from roma_trading.prompts import get_prompt_template
         
@@ -667,11 +1051,14 @@ class AnalysisEngine:
             # Fallback if prompt not found
             prompt_template = self._get_fallback_prompt(prompt_language)
         
-        # Replace placeholders manually
-        analysis_prompt = prompt_template.replace("{TRADE_SUMMARY}", trade_summary)
-        analysis_prompt = analysis_prompt.replace("{WIN_RATE}", f"{win_rate * 100:.1f}")
-        analysis_prompt = analysis_prompt.replace("{PROFIT_FACTOR}", f"{profit_factor:.2f}")
-        analysis_prompt = analysis_prompt.replace("{AVG_PNL}", f"{avg_pnl:.2f}")
+        # Replace placeholders manually, in a single pass over the template
+        replacements = {
+            "TRADE_SUMMARY": trade_summary,
+            "WIN_RATE": f"{win_rate * 100:.1f}",
+            "PROFIT_FACTOR": f"{profit_factor:.2f}",
+            "AVG_PNL": f"{avg_pnl:.2f}",
+        }
+        analysis_prompt = _ANALYSIS_PLACEHOLDER_RE.sub(lambda m: replacements[m.group(1)], prompt_template)
         
         # Run LLM analysis
         try:
@@ -693,6 +1080,7 @@ class AnalysisEngine:
                     profit_factor,
                     avg_pnl,
                     prompt_language,
+                    arrays=arrays,
                 )
             
             # Parse insights
@@ -716,13 +1104,14 @@ class AnalysisEngine:
                     profit_factor,
                     avg_pnl,
                     prompt_language,
+                    arrays=arrays,
                 )
             
             logger.info(f"Generated {len(insights)} insights from {len(trades)} trades")
             return insights
             
         except Exception as e:
-            logger.error(f"LLM analysis failed: {e}", exc_info=True)
+            logger.error(f"LLM analysis failed: {e}")
             logger.info("Falling back to rule-based insights")
             # Fallback to rule-based
             return self._generate_rule_based_insights(
@@ -734,6 +1123,7 @@ class AnalysisEngine:
                 profit_factor,
                 avg_pnl,
                 prompt_language,
+                arrays=arrays,
             )
     
     def _run_llm_analysis(self, lm: Any, prompt: str) -> str:
@@ -750,51 +1140,49 @@ class AnalysisEngine:
             result = module(analysis_prompt=prompt)
             return result.insights_json
     
-    def _format_trade_summary(self, trades: List[TradeHistory]) -> str:
+    def _format_trade_summary(
+        self,
+        trades: List[TradeHistory],
+        arrays: Optional[Dict[str, np.ndarray]] = None,
+    ) -> str:
         """Format trades into summary text for LLM."""
         lines = []
-        lines.append(f"Total Trades: {len(trades)}")
-        lines.append(f"Analysis Period: {trades[0].entry_time.date()} to {trades[-1].exit_time.date()}")
-        lines.append("")
-        
-        # Group by symbol
-        by_symbol: Dict[str, List[TradeHistory]] = {}
-        for trade in trades:
-            if trade.symbol not in by_symbol:
-                by_symbol[trade.symbol] = []
-            by_symbol[trade.symbol].append(trade)
-        
-        for symbol, symbol_trades in by_symbol.items():
-            lines.append(f"**{symbol}**:")
-            wins = [t for t in symbol_trades if t.pnl_usdt > 0]
-            losses = [t for t in symbol_trades if t.pnl_usdt < 0]
-            lines.append(f"  - Total: {len(symbol_trades)} trades")
-            lines.append(f"  - Wins: {len(wins)} ({len(wins)/len(symbol_trades)*100:.1f}%)")
-            lines.append(f"  - Losses: {len(losses)} ({len(losses)/len(symbol_trades)*100:.1f}%)")
-            if wins:
-                avg_win = sum(t.pnl_usdt for t in wins) / len(wins)
-                lines.append(f"  - Avg Win: ${avg_win:.2f}")
-            if losses:
-                avg_loss = sum(t.pnl_usdt for t in losses) / len(losses)
-                lines.append(f"  - Avg Loss: ${avg_loss:.2f}")
-            lines.append("")
+        append = lines.append
+        append(f"Total Trades: {len(trades)}")
+        append(f"Analysis Period: {trades[0].entry_time.date()} to {trades[-1].exit_time.date()}")
+        append("")
+        
+        if arrays is None:
+            arrays = TradeHistoryCollector.collect_trades_arrays(trades)
+        by_symbol = _symbol_stats(trades, arrays)
+        for symbol, (count, n_wins, n_losses, sum_win, sum_loss) in by_symbol.items():
+            append(f"**{symbol}**:")
+            append(f"  - Total: {count} trades")
+            append(f"  - Wins: {n_wins} ({n_wins/count*100:.1f}%)")
+            append(f"  - Losses: {n_losses} ({n_losses/count*100:.1f}%)")
+            if n_wins:
+                append(f"  - Avg Win: ${sum_win / n_wins:.2f}")
+            if n_losses:
+                append(f"  - Avg Loss: ${sum_loss / n_losses:.2f}")
+            append("")
         
         # Sample trades (winning and losing)
-        lines.append("**Sample Winning Trades:**")
-        winning_samples = sorted([t for t in trades if t.pnl_usdt > 0], key=lambda x: x.pnl_usdt, reverse=True)[:5]
-        for trade in winning_samples:
-            lines.append(
+        pnl = arrays["pnl_usdt"]
+        append("**Sample Winning Trades:**")
+        for i in _top_pnl_indices(pnl, pnl > 0, 5, largest=True):
+            trade = trades[i]
+            append(
                 f"  - {trade.symbol} {trade.side.upper()}: "
                 f"Entry ${trade.entry_price:.2f}, Exit ${trade.exit_price:.2f}, "
                 f"P&L ${trade.pnl_usdt:.2f} ({trade.pnl_pct:+.2f}%), "
                 f"Held {trade.holding_period_minutes}min"
             )
         
-        lines.append("")
-        lines.append("**Sample Losing Trades:**")
-        losing_samples = sorted([t for t in trades if t.pnl_usdt < 0], key=lambda x: x.pnl_usdt)[:5]
-        for trade in losing_samples:
-            lines.append(
+        append("")
+        append("**Sample Losing Trades:**")
+        for i in _top_pnl_indices(pnl, pnl < 0, 5, largest=False):
+            trade = trades[i]
+            append(
                 f"  - {trade.symbol} {trade.side.upper()}: "
                 f"Entry ${trade.entry_price:.2f}, Exit ${trade.exit_price:.2f}, "
                 f"P&L ${trade.pnl_usdt:.2f} ({trade.pnl_pct:+.2f}%), "
@@ -812,9 +1200,6 @@ class AnalysisEngine:
         analysis_period_end: datetime,
     ) -> List[AnalysisInsight]:
         """Parse insights from LLM JSON response."""
-        import json
-        import re
-        
         insights = []
         
         try:
@@ -823,19 +1208,19 @@ class AnalysisEngine:
             json_str = None
             
             # Pattern 1: Look for JSON code block
-            code_block_match = re.search(r'```(?:json)?\s*(\{.*?\})\s*```', insights_json, re.DOTALL)
+            code_block_match = _RE_CODE_BLOCK.search(insights_json)
             if code_block_match:
                 json_str = code_block_match.group(1)
             
             # Pattern 2: Look for JSON object with insights array
             if not json_str:
-                json_match = re.search(r'\{[^{}]*"insights"[^{}]*\[.*?\]\s*\}', insights_json, re.DOTALL)
+                json_match = _RE_INSIGHTS_OBJ.search(insights_json)
                 if json_match:
                     json_str = json_match.group(0)
             
             # Pattern 3: Try to find any JSON object
             if not json_str:
-                json_match = re.search(r'\{.*"insights".*\[.*?\].*?\}', insights_json, re.DOTALL)
+                json_match = _RE_INSIGHTS_FALLBACK.search(insights_json)
                 if json_match:
                     json_str = json_match.group(0)
             
@@ -846,35 +1231,37 @@ class AnalysisEngine:
             # Clean up JSON string
             json_str = json_str.strip()
             # Remove markdown formatting if present
-            json_str = re.sub(r'^```(?:json)?\s*', '', json_str)
-            json_str = re.sub(r'\s*```$', '', json_str)
+            json_str = _RE_MD_OPEN.sub('', json_str)
+            json_str = _RE_MD_CLOSE.sub('', json_str)
             
-            # Try to parse
+            # Try to parse: progressively repaired variants, then just the array
             data = None
-            parse_attempts = [
-                # Attempt 1: Direct parse
-                lambda s: json.loads(s),
-                # Attempt 2: Fix trailing commas
-                lambda s: json.loads(re.sub(r',\s*}', '}', re.sub(r',\s*]', ']', s))),
-                # Attempt 3: Fix single quotes
-                lambda s: json.loads(s.replace("'", '"')),
-                # Attempt 4: Fix both
-                lambda s: json.loads(re.sub(r',\s*}', '}', re.sub(r',\s*]', ']', s.replace("'", '"')))),
-                # Attempt 5: Try to extract just the insights array
-                lambda s: {"insights": json.loads(re.search(r'\[.*?\]', s, re.DOTALL).group(0)) if re.search(r'\[.*?\]', s, re.DOTALL) else []},
-            ]
-            
-            for i, attempt in enumerate(parse_attempts):
+            attempt = 0
+            for attempt, candidate in enumerate(_json_repair_candidates(json_str), 1):
                 try:
-                    data = attempt(json_str)
-                    if data:
-                        logger.debug(f"Successfully parsed JSON on attempt {i+1}")
-                        break
-                except (json.JSONDecodeError, AttributeError) as e:
-                    if i == len(parse_attempts) - 1:
-                        logger.warning(f"All JSON parse attempts failed. Last error: {e}")
-                        logger.debug(f"JSON string (first 1000 chars): {json_str[:1000]}")
+                    data = _json_loads(candidate)
+                except json.JSONDecodeError:
                     continue
+                if data:
+                    break
+            
+            if data:
+                logger.debug(f"Successfully parsed JSON on attempt {attempt}")
+            else:
+                array_match = _RE_ARRAY.search(json_str)
+                try:
+                    data = {"insights": _json_loads(array_match.group(0)) if array_match else []}
+                    logger.debug(f"Successfully parsed JSON on attempt {attempt + 1}")
+                except json.JSONDecodeError as e:
+                    logger.warning(f"All JSON parse attempts failed. Last error: {e}")
+                    logger.debug(f"JSON string (first 1000 chars): {json_str[:1000]}")
+                
+                if not (data and data["insights"]):
+                    # The response may have been cut off mid-array; keep the insights that completed
+                    salvaged = _salvage_insights(insights_json)
+                    if salvaged:
+                        logger.debug(f"Recovered {len(salvaged)} complete insights from a truncated response")
+                        data = {"insights": salvaged}
             
             if not data:
                 logger.error("Could not parse JSON from LLM response")
@@ -886,35 +1273,43 @@ class AnalysisEngine:
                 logger.warning("'insights' is not a list in JSON response")
                 return []
             
+            created_at = datetime.now()
+            # Lowercased IDs of the trades eligible for matching
+            match_trades = [(trade.trade_id, trade.trade_id.lower()) for trade in trades[:10]]
+            
             for insight_data in insights_list:
                 try:
                     if not isinstance(insight_data, dict):
                         continue
                     
-                    category_str = insight_data.get("category", "entry_timing")
-                    try:
-                        category = InsightCategory(category_str)
-                    except ValueError:
+                    insight_data = {**_INSIGHT_DEFAULTS, **insight_data}
+                    
+                    category_str = insight_data["category"]
+                    category = _CAT_BY_VALUE.get(category_str) if isinstance(category_str, str) else None
+                    if category is None:
                         logger.warning(f"Invalid category '{category_str}', using entry_timing")
                         category = InsightCategory.ENTRY_TIMING
                     
                     # Map trade IDs to actual trades
-                    supporting_ids = insight_data.get("supporting_trade_ids", [])
+                    supporting_ids = insight_data["supporting_trade_ids"]
                     if not isinstance(supporting_ids, list):
                         supporting_ids = []
                     
                     # If trade IDs are not in format, try to match by pattern
+                    # Lowercased once per insight, without duplicates
+                    supporting_lower = tuple(dict.fromkeys(str(sid).lower() for sid in supporting_ids))
                     valid_ids = []
-                    for trade in trades[:10]:  # Limit to first 10 for matching
-                        if any(str(sid).lower() in trade.trade_id.lower() for sid in supporting_ids):
-                            valid_ids.append(trade.trade_id)
+                    if supporting_lower:
+                        for trade_id, trade_id_lower in match_trades:  # Limit to first 10 for matching
+                            if any(sid in trade_id_lower for sid in supporting_lower):
+                                valid_ids.append(trade_id)
                     
                     if not valid_ids and trades:
                         # Default to first few trades as examples
                         valid_ids = [t.trade_id for t in trades[:3]]
                     
                     # Ensure recommendations is a list
-                    recommendations = insight_data.get("recommendations", [])
+                    recommendations = insight_data["recommendations"]
                     if not isinstance(recommendations, list):
                         recommendations = []
                     
@@ -923,22 +1318,22 @@ class AnalysisEngine:
                         agent_id=agent_id,
                         analysis_period_start=analysis_period_start,
                         analysis_period_end=analysis_period_end,
-                        created_at=datetime.now(),
+                        created_at=created_at,
                         category=category,
-                        title=str(insight_data.get("title", "Untitled Insight")),
-                        summary=str(insight_data.get("summary", "")),
-                        detailed_findings=str(insight_data.get("detailed_findings", "")),
+                        title=str(insight_data["title"]),
+                        summary=str(insight_data["summary"]),
+                        detailed_findings=str(insight_data["detailed_findings"]),
                         recommendations=recommendations,
-                        confidence_score=float(insight_data.get("confidence_score", 0.7)),
+                        confidence_score=float(insight_data["confidence_score"]),
                         supporting_trade_ids=valid_ids,
                         trade_count=len(trades),
                     )
                     insights.append(insight)
                 except Exception as e:
-                    logger.warning(f"Failed to parse individual insight: {e}", exc_info=True)
+                    logger.warning(f"Failed to parse individual insight: {e}")
             
         except Exception as e:
-            logger.error(f"Failed to parse insights JSON: {e}", exc_info=True)
+            logger.error(f"Failed to parse insights JSON: {e}")
             logger.debug(f"JSON string (first 1000 chars): {insights_json[:1000] if insights_json else 'None'}")
         
         return insights
@@ -953,26 +1348,52 @@ class AnalysisEngine:
         profit_factor: float,
         avg_pnl: float,
         language: str = "en",
+        arrays: Optional[Dict[str, np.ndarray]] = None,
     ) -> List[AnalysisInsight]:
         """Generate rule-based insights as fallback."""
         insights = []
+        created_at = datetime.now()
         
-        winning_trades = [t for t in trades if t.pnl_usdt > 0]
-        losing_trades = [t for t in trades if t.pnl_usdt < 0]
+        if arrays is None:
+            arrays = TradeHistoryCollector.collect_trades_arrays(trades)
+        pnl = arrays["pnl_usdt"]
+        # Supporting evidence: the first five winning / losing trades
+        winning_ids = [trades[i].trade_id for i in np.flatnonzero(pnl > 0)[:5]]
+        losing_ids = [trades[i].trade_id for i in np.flatnonzero(pnl < 0)[:5]]
         
-        is_zh = (language or "en").lower().startswith("zh")
+        is_zh = _is_zh_language(language)
         
         def t(en_text: str, zh_text: str) -> str:
             return zh_text if is_zh else en_text
         
-        # Insight 1: Win rate analysis
-        if win_rate > 0.6:
-            insights.append(AnalysisInsight(
+        def make_insight(
+            category: InsightCategory,
+            title: str,
+            summary: str,
+            detailed_findings: str,
+            recommendations: List[str],
+            confidence_score: float,
+            supporting_trade_ids: List[str],
+        ) -> AnalysisInsight:
+            return AnalysisInsight(
                 insight_id=f"ins_{uuid.uuid4().hex[:12]}",
                 agent_id=agent_id,
                 analysis_period_start=analysis_period_start,
                 analysis_period_end=analysis_period_end,
-                created_at=datetime.now(),
+                created_at=created_at,
+                category=category,
+                title=title,
+                summary=summary,
+                detailed_findings=detailed_findings,
+                recommendations=recommendations,
+                confidence_score=confidence_score,
+                supporting_trade_ids=supporting_trade_ids,
+                trade_count=len(trades),
+            )
+        
+        # Insight 1: Win rate analysis
+        if win_rate > 0.6:
+            insights.append(make_insight(
                 category=InsightCategory.ENTRY_TIMING,
                 title=t("Strong Win Rate Maintained", "胜率表现稳健"),
                 summary=t(
@@ -988,16 +1409,10 @@ class AnalysisEngine:
                     t("Review winning trades for common patterns", "回顾盈利交易，提炼共同模式"),
                 ],
                 confidence_score=0.75,
-                supporting_trade_ids=[t.trade_id for t in winning_trades[:5]],
-                trade_count=len(trades),
+                supporting_trade_ids=winning_ids,
             ))
         elif win_rate < 0.4:
-            insights.append(AnalysisInsight(
-                insight_id=f"ins_{uuid.uuid4().hex[:12]}",
-                agent_id=agent_id,
-                analysis_period_start=analysis_period_start,
-                analysis_period_end=analysis_period_end,
-                created_at=datetime.now(),
+            insights.append(make_insight(
                 category=InsightCategory.ENTRY_TIMING,
                 title=t("Low Win Rate - Review Entry Criteria", "胜率较低，需重新评估入场条件"),
                 summary=t(
@@ -1014,18 +1429,12 @@ class AnalysisEngine:
                     t("Analyze losing trades for common mistakes", "分析亏损交易定位常见错误"),
                 ],
                 confidence_score=0.8,
-                supporting_trade_ids=[t.trade_id for t in losing_trades[:5]],
-                trade_count=len(trades),
+                supporting_trade_ids=losing_ids,
             ))
         
         # Insight 2: Profit factor analysis
         if profit_factor > 1.5:
-            insights.append(AnalysisInsight(
-                insight_id=f"ins_{uuid.uuid4().hex[:12]}",
-                agent_id=agent_id,
-                analysis_period_start=analysis_period_start,
-                analysis_period_end=analysis_period_end,
-                created_at=datetime.now(),
+            insights.append(make_insight(
                 category=InsightCategory.EXIT_TIMING,
                 title=t("Strong Profit Factor", "盈亏比表现优秀"),
                 summary=t(
@@ -1041,15 +1450,14 @@ class AnalysisEngine:
                     t("Consider letting winners run longer", "尝试让盈利单持有更久以延伸收益"),
                 ],
                 confidence_score=0.7,
-                supporting_trade_ids=[t.trade_id for t in winning_trades[:5]],
-                trade_count=len(trades),
+                supporting_trade_ids=winning_ids,
             ))
         
         return insights
     
     def _get_fallback_prompt(self, language: str = "en") -> str:
         """Get fallback analysis prompt if template not found."""
-        if (language or "en").lower().startswith("zh"):
+        if _is_zh_language(language):
             return """请分析以下交易历史，提取可执行的洞察，并以 JSON 格式返回。
 
 交易数据：
@@ -1118,36 +1526,42 @@ class TradeHistoryAnalyzer:
         self.insight_repo = InsightRepository(storage_dir=str(self.storage_dir / "insights"))
         self.analysis_engine = AnalysisEngine(agent_manager=agent_manager, llm_provider=llm_provider)
         self._system_prompt_language: Optional[str] = None
+        self._system_prompt_mtime: Optional[int] = None
         
         # Job tracking
         self.jobs_file = self.storage_dir / "jobs.json"
         self.jobs: Dict[str, AnalysisJob] = {}
+        # IDs of jobs changed since the last save, and the last serialized form of each job
+        self._dirty_job_ids: set = set()
+        self._serialized_jobs: Dict[str, Dict] = {}
         self._load_jobs()
     
     def _load_jobs(self) -> None:
         """Load analysis jobs from disk."""
         if self.jobs_file.exists():
             try:
-                with open(self.jobs_file, "r") as f:
-                    jobs_data = json.load(f)
-                    for job_data in jobs_data:
-                        # Reconstruct datetime fields
-                        job_data["scheduled_at"] = datetime.fromisoformat(job_data["scheduled_at"])
-                        if job_data.get("started_at"):
-                            job_data["started_at"] = datetime.fromisoformat(job_data["started_at"])
-                        if job_data.get("completed_at"):
-                            job_data["completed_at"] = datetime.fromisoformat(job_data["completed_at"])
-                        
-                        job = AnalysisJob(**job_data)
-                        self.jobs[job.job_id] = job
+                for job_data in orjson.loads(self.jobs_file.read_bytes()):
+                    job = AnalysisJob.from_raw(job_data)
+                    self.jobs[job.job_id] = job
             except Exception as e:
                 logger.error(f"Failed to load analysis jobs: {e}")
     
     def _save_jobs(self) -> None:
-        """Save analysis jobs to disk."""
-        jobs_data = [job.to_dict() for job in self.jobs.values()]
-        with open(self.jobs_file, "w") as f:
-            json.dump(jobs_data, f, indent=2)
+        """Save analysis jobs to disk if they changed since the last save."""
+        if not self._dirty_job_ids:
+            return
+        
+        # Only re-serialize jobs that changed (or were never serialized)
+        serialized = self._serialized_jobs
+        for job_id, job in self.jobs.items():
+            if job_id in self._dirty_job_ids or job_id not in serialized:
+                serialized[job_id] = job.to_dict()
+        jobs_data = [serialized[job_id] for job_id in self.jobs]
+        # Write to a temp file and rename so a crash never leaves a truncated jobs file
+        tmp_file = self.jobs_file.with_suffix(".json.tmp")
+        tmp_file.write_bytes(orjson.dumps(jobs_data, option=orjson.OPT_INDENT_2))
+        os.replace(tmp_file, self.jobs_file)
+        self._dirty_job_ids.clear()
     
     async def run_analysis(
         self,
@@ -1169,18 +1583,19 @@ class TradeHistoryAnalyzer:
             AnalysisJob with results
         """
         job_id = f"job_{uuid.uuid4().hex[:12]}"
+        now = datetime.now()
         job = AnalysisJob(
             job_id=job_id,
             agent_id=agent_id,
             status="running",
-            scheduled_at=datetime.now(),
-            started_at=datetime.now(),
+            scheduled_at=now,
+            started_at=now,
             analysis_period_days=analysis_period_days,
             min_trades_required=min_trades_required,
         )
         
         self.jobs[job_id] = job
-        self._save_jobs()
+        self._dirty_job_ids.add(job_id)
         
         try:
             # Get agent's DecisionLogger
@@ -1197,7 +1612,7 @@ class TradeHistoryAnalyzer:
                 raise ValueError(f"Agent {agent_id} not found or no decision logger available")
             
             # Determine analysis period
-            end_date = datetime.now()
+            end_date = now
             start_date = end_date - timedelta(days=analysis_period_days)
             
             # Check for snapshot
@@ -1245,6 +1660,7 @@ class TradeHistoryAnalyzer:
                 raise ValueError(error_msg)
             
             job.trades_analyzed = len(trades)
+            stats = TradeStats.from_trades(trades)
             
             # Analyze trades
             insights = await self.analysis_engine.analyze_trades(
@@ -1253,13 +1669,16 @@ class TradeHistoryAnalyzer:
                 start_date,
                 end_date,
                 language=analysis_language,
+                min_trades=min_trades_required,
+                stats=stats,
             )
             
             # Save insights
-            insight_ids = []
-            for insight in insights:
-                await self.insight_repo.save_insight(insight)
-                insight_ids.append(insight.insight_id)
+            insight_ids = await self.insight_repo.save_insights_batch(insights)
+            if len(insight_ids) < len(insights):
+                # Job and snapshot reference only the insights that were written
+                saved = set(insight_ids)
+                insights = [ins for ins in insights if ins.insight_id in saved]
             
             job.insights_generated = len(insights)
             job.insight_ids = insight_ids
@@ -1270,6 +1689,7 @@ class TradeHistoryAnalyzer:
                 job,
                 trades,
                 insights,
+                stats,
             )
             
             job.status = "completed"
@@ -1284,8 +1704,9 @@ class TradeHistoryAnalyzer:
             job.status = "failed"
             job.error_message = str(e)
             job.completed_at = datetime.now()
-            logger.error(f"Analysis failed for {agent_id or 'global'}: {e}", exc_info=True)
+            logger.error(f"Analysis failed for {agent_id or 'global'}: {e}")
         
+        self._dirty_job_ids.add(job_id)
         self._save_jobs()
         return job
     
@@ -1310,27 +1731,28 @@ class TradeHistoryAnalyzer:
         if not lang:
             return "en"
         
-        lang = str(lang).lower()
-        if lang.startswith("zh"):
-            return "zh"
-        return "en"
+        return "zh" if _is_zh_language(str(lang)) else "en"
     
     def _get_system_prompt_language(self) -> Optional[str]:
-        """Load system prompt language from trading configuration if available."""
-        if self._system_prompt_language:
-            return self._system_prompt_language
+        """
+        Load system prompt language from trading configuration if available.
         
+        The value is cached until the config file's mtime changes.
+        """
         config_path = getattr(self.agent_manager, "config_path", None)
         if not config_path:
             return None
         
         try:
+            mtime = os.stat(config_path).st_mtime_ns
+            if mtime == self._system_prompt_mtime:
+                return self._system_prompt_language
+            
             with open(config_path, "r") as f:
-                config = yaml.safe_load(f)
-            lang = config.get("system", {}).get("prompt_language")
-            if lang:
-                self._system_prompt_language = lang
-                return lang
+                config = yaml.load(f, Loader=_YamlLoader)
+            self._system_prompt_language = config.get("system", {}).get("prompt_language") or None
+            self._system_prompt_mtime = mtime
+            return self._system_prompt_language
         except Exception as exc:
             logger.debug(f"Failed to load system prompt language: {exc}")
         
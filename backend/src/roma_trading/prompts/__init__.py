@@ -2,11 +2,19 @@
 
 from __future__ import annotations
 
+import re
+import string
 from pathlib import Path
-from typing import Dict, Optional, Iterable
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Iterable, Tuple
 
 from loguru import logger
 
+_FORMATTER = string.Formatter()
+
+# (literal_text, field_name, format_spec, conversion) segments from string.Formatter.parse
+ParsedTemplate = List[Tuple[str, Optional[str], Optional[str], Optional[str]]]
+
 
 class PromptRepository:
     """Load and render prompt templates from disk."""
@@ -15,7 +23,11 @@ class PromptRepository:
         package_root = Path(__file__).resolve().parents[3]  # backend/
         default_dir = package_root / "prompts"
         self.base_dir: Path = Path(base_dir) if base_dir else default_dir
-        self.templates: Dict[str, str] = {}
+        self.templates: Mapping[str, str] = MappingProxyType({})
+        # path -> (mtime_ns, text) of the files read by the last load
+        self._files: Dict[Path, Tuple[int, str]] = {}
+        self._parsed: Dict[str, ParsedTemplate] = {}
+        self._replace_patterns: Dict[Tuple[str, ...], Optional[re.Pattern]] = {}
 
     def load(self, base_dir: Optional[str | Path] = None) -> None:
         """Load prompt templates from disk into memory."""
@@ -24,15 +36,29 @@ class PromptRepository:
 
         if not self.base_dir.exists():
             logger.warning(f"Prompt directory not found: {self.base_dir}")
-            self.templates = {}
+            self.templates = MappingProxyType({})
+            self._files = {}
+            self._parsed = {}
             return
 
         new_templates: Dict[str, str] = {}
+        new_files: Dict[Path, Tuple[int, str]] = {}
         for path in self.base_dir.rglob("*.md"):
             key = path.stem.lower()
-            new_templates[key] = path.read_text(encoding="utf-8")
-
-        self.templates = new_templates
+            mtime_ns = path.stat().st_mtime_ns
+            cached = self._files.get(path)
+            # Only re-read files modified since the previous load
+            text = cached[1] if cached and cached[0] == mtime_ns else path.read_text(encoding="utf-8")
+            new_files[path] = (mtime_ns, text)
+            new_templates[key] = text
+
+        # Keep parsed fields of templates whose text was reused unchanged
+        self._parsed = {
+            key: parsed for key, parsed in self._parsed.items()
+            if new_templates.get(key) is self.templates.get(key)
+        }
+        self._files = new_files
+        self.templates = MappingProxyType(new_templates)
         logger.info(f"Loaded {len(self.templates)} prompt templates from {self.base_dir}")
 
     def _candidate_keys(self, name: str, language: Optional[str]) -> Iterable[str]:
@@ -41,13 +67,43 @@ class PromptRepository:
             yield f"{normalized_name}_{language.lower()}"
         yield normalized_name
 
-    def get_template(self, name: str, language: Optional[str] = None) -> str:
-        """Retrieve a prompt template by name/language."""
+    def _resolve_key(self, name: str, language: Optional[str]) -> str:
         for key in self._candidate_keys(name, language):
             if key in self.templates:
-                return self.templates[key]
+                return key
         raise ValueError(f"Prompt template '{name}' (language={language}) not found in {self.base_dir}")
 
+    def get_template(self, name: str, language: Optional[str] = None) -> str:
+        """Retrieve a prompt template by name/language."""
+        return self.templates[self._resolve_key(name, language)]
+
+    def _parse(self, key: str) -> ParsedTemplate:
+        """Return the format fields of a template, parsed once per load."""
+        parsed = self._parsed.get(key)
+        if parsed is None:
+            parsed = self._parsed[key] = list(_FORMATTER.parse(self.templates[key]))
+        return parsed
+
+    def _format(self, key: str, context: Dict[str, object]) -> str:
+        """Equivalent to ``template.format(**context)`` using the pre-parsed fields."""
+        parts = []
+        for literal, field_name, format_spec, conversion in self._parse(key):
+            if literal:
+                parts.append(literal)
+            if field_name is None:
+                continue
+            if field_name.isidentifier():
+                value = context[field_name]
+            else:
+                # Attribute/index lookups; "{}" fails on the empty positional args like str.format
+                value = _FORMATTER.get_field(field_name or "0", (), context)[0]
+            if conversion:
+                value = _FORMATTER.convert_field(value, conversion)
+            if format_spec and "{" in format_spec:
+                format_spec = _FORMATTER.vformat(format_spec, (), context)
+            parts.append(format(value, format_spec))
+        return "".join(parts)
+
     def render_prompt(
         self,
         name: str,
@@ -56,13 +112,45 @@ class PromptRepository:
         replacements: Optional[Dict[str, str]] = None,
     ) -> str:
         """Render a prompt template with optional formatting and replacements."""
-        template = self.get_template(name, language)
-        rendered = template.format(**(context or {}))
+        key = self._resolve_key(name, language)
+        template = self.templates[key]
+        if "{" in template or "}" in template:
+            rendered = self._format(key, context or {})
+        else:
+            # Nothing to format (and no braces to unescape or reject)
+            rendered = template
 
         if replacements:
-            for placeholder, value in replacements.items():
-                rendered = rendered.replace(placeholder, value)
+            rendered = self._apply_replacements(rendered, replacements)
+
+        return rendered
 
+    def _replacement_pattern(self, placeholders: Tuple[str, ...]) -> Optional[re.Pattern]:
+        """
+        Alternation matching all placeholders, or None when a single pass would not
+        match sequential replacement (empty or overlapping placeholders).
+        """
+        if placeholders not in self._replace_patterns:
+            overlapping = any(
+                not a or (a != b and a in b)
+                for a in placeholders
+                for b in placeholders
+            )
+            self._replace_patterns[placeholders] = None if overlapping else re.compile(
+                "|".join(re.escape(placeholder) for placeholder in placeholders)
+            )
+        return self._replace_patterns[placeholders]
+
+    def _apply_replacements(self, rendered: str, replacements: Dict[str, str]) -> str:
+        """Apply placeholder replacements, in one regex pass when that is equivalent."""
+        if len(replacements) > 2:
+            pattern = self._replacement_pattern(tuple(replacements))
+            # A value containing a placeholder would be replaced again by the sequential loop
+            if pattern is not None and not any(pattern.search(value) for value in replacements.values()):
+                return pattern.sub(lambda match: replacements[match.group(0)], rendered)
+
+        for placeholder, value in replacements.items():
+            rendered = rendered.replace(placeholder, value)
         return rendered
 
 
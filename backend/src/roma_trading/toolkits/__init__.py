@@ -4,9 +4,10 @@ from .base_dex import BaseDEXToolkit
 from .aster_toolkit import AsterToolkit
 from .technical_analysis import TechnicalAnalysisToolkit
 
+__all__ = ["BaseDEXToolkit", "AsterToolkit", "TechnicalAnalysisToolkit"]
+
 try:
     from .hyperliquid_toolkit import HyperliquidToolkit
-    __all__ = ["BaseDEXToolkit", "AsterToolkit", "HyperliquidToolkit", "TechnicalAnalysisToolkit"]
+    __all__.insert(2, "HyperliquidToolkit")
 except ImportError:
-    __all__ = ["BaseDEXToolkit", "AsterToolkit", "TechnicalAnalysisToolkit"]
-
+    pass
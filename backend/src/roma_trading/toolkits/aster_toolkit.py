@@ -7,20 +7,53 @@ including account management, position handling, and order execution.
 Based on nofx/trader/aster_trader.go implementation.
 """
 
+import math
 import time
-import json
 import asyncio
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional, Tuple
 from decimal import Decimal
+from operator import itemgetter
 import httpx
+import orjson
 from eth_account import Account
-from eth_account.messages import encode_defunct
 from eth_abi import encode
-from web3 import Web3
+from eth_hash.auto import keccak
+from eth_keys import keys
 from loguru import logger
 
 from .base_dex import BaseDEXToolkit
 
+# Head offset of the string argument in abi.encode(string, address, address, uint256)
+_ABI_STRING_OFFSET = (4 * 32).to_bytes(32, "big")
+
+
+def _make_formatter(precision: int, step: float = 0.0) -> Callable[[float], str]:
+    """
+    Build a formatter specialized to a fixed precision and step size.
+    
+    Args:
+        precision: Number of decimal places
+        step: Step size (if provided, values are rounded to the nearest step)
+        
+    Returns:
+        Function formatting a value as a string without trailing zeros
+    """
+    spec = f".{precision}f"
+    
+    if step > 0:
+        def format_value(value: float) -> str:
+            # Round to nearest step, then remove trailing zeros and decimal point if not needed
+            return format(round(value / step) * step, spec).rstrip('0').rstrip('.')
+    else:
+        def format_value(value: float) -> str:
+            return format(value, spec).rstrip('0').rstrip('.')
+    
+    return format_value
+
+
+# EIP-191 personal_sign header for a 32-byte message (what encode_defunct builds)
+_EIP191_PREFIX_32 = b"\x19Ethereum Signed Message:\n32"
+
 
 class AsterToolkit(BaseDEXToolkit):
     """
@@ -35,6 +68,8 @@ class AsterToolkit(BaseDEXToolkit):
 
     BASE_URL = "https://fapi.asterdex.com"
     RECV_WINDOW = "50000"  # milliseconds
+    PRECISION_TTL = 3600.0  # seconds before exchange info is refetched
+    PRICE_TTL = 0.25  # seconds a fetched market price is reused
     
     def __init__(self, user: str, signer: str, private_key: str, hedge_mode: bool = False):
         """
@@ -54,21 +89,41 @@ class AsterToolkit(BaseDEXToolkit):
         if private_key.startswith("0x"):
             private_key = private_key[2:]
         self.account = Account.from_key(private_key)
+        # Parsed once; eth_keys signs with libsecp256k1 when coincurve is installed
+        self._signing_key = keys.PrivateKey(bytes(self.account.key))
+        
+        # ABI-encoded (user, signer) words, fixed for every signed request
+        self._abi_addresses = encode(['address', 'address'], [user, signer])
         
-        # HTTP client with reasonable timeouts
+        # HTTP client with reasonable timeouts; HTTP/2 multiplexes bursts of
+        # signed requests (cancel, leverage, order, TP/SL) over one connection
         self.client = httpx.AsyncClient(
+            http2=True,
             timeout=httpx.Timeout(30.0, connect=10.0),
-            limits=httpx.Limits(max_keepalive_connections=5)
+            limits=httpx.Limits(max_keepalive_connections=16, max_connections=32, keepalive_expiry=60.0)
         )
         
-        # Cache for symbol precision
+        # Cache for symbol precision, filled for all symbols from one exchange info fetch
         self._precision_cache: Dict[str, Dict] = {}
+        self._precision_fetched_at = 0.0
+        self._precision_lock = asyncio.Lock()
+        # Per-symbol (price, quantity) formatters built from the cached precision
+        self._formatters: Dict[str, Tuple[Callable[[float], str], Callable[[float], str]]] = {}
+        
+        # Recently fetched prices (monotonic time, price) and in-flight price fetches
+        self._price_cache: Dict[str, Tuple[float, float]] = {}
+        self._price_inflight: Dict[str, asyncio.Task] = {}
+        
+        # Last nonce handed out; keeps nonces unique for concurrent requests
+        self._last_nonce = 0
         
         logger.info(f"Initialized AsterToolkit for user={user[:8]}..., signer={signer[:8]}...")
 
     def _gen_nonce(self) -> int:
-        """Generate microsecond timestamp as nonce."""
-        return int(time.time() * 1_000_000)
+        """Generate microsecond timestamp as nonce, strictly increasing per toolkit."""
+        nonce = max(time.time_ns() // 1_000, self._last_nonce + 1)
+        self._last_nonce = nonce
+        return nonce
 
     async def _get_precision(self, symbol: str) -> Dict:
         """
@@ -77,74 +132,76 @@ class AsterToolkit(BaseDEXToolkit):
         Returns:
             Dict with price_precision, quantity_precision, tick_size, step_size
         """
-        if symbol in self._precision_cache:
+        fetched_at = self._precision_fetched_at
+        if symbol in self._precision_cache and time.monotonic() - fetched_at < self.PRECISION_TTL:
             return self._precision_cache[symbol]
         
-        # Fetch exchange info
+        # Single-flight: concurrent callers wait for one exchange info fetch
+        async with self._precision_lock:
+            if self._precision_fetched_at == fetched_at:
+                await self._load_exchange_info()
+        
+        if symbol not in self._precision_cache:
+            raise ValueError(f"Symbol {symbol} not found in exchange info")
+        return self._precision_cache[symbol]
+
+    async def _load_exchange_info(self) -> None:
+        """Fetch exchange info and cache precision for every symbol."""
         response = await self.client.get(f"{self.BASE_URL}/fapi/v3/exchangeInfo")
         response.raise_for_status()
-        data = response.json()
+        data = orjson.loads(response.content)
         
         # Parse precision for all symbols
+        precision_cache = {}
         for s in data.get("symbols", []):
-            if s["symbol"] == symbol:
-                precision_info = {
-                    "price_precision": s["pricePrecision"],
-                    "quantity_precision": s["quantityPrecision"],
-                    "tick_size": 0.0,
-                    "step_size": 0.0,
-                }
-                
-                # Extract tick_size and step_size from filters
-                for f in s.get("filters", []):
-                    if f["filterType"] == "PRICE_FILTER":
-                        precision_info["tick_size"] = float(f.get("tickSize", 0))
-                    elif f["filterType"] == "LOT_SIZE":
-                        precision_info["step_size"] = float(f.get("stepSize", 0))
-                
-                self._precision_cache[symbol] = precision_info
-                return precision_info
+            precision_info = {
+                "price_precision": s["pricePrecision"],
+                "quantity_precision": s["quantityPrecision"],
+                "tick_size": 0.0,
+                "step_size": 0.0,
+            }
+            
+            # Extract tick_size and step_size from filters
+            for f in s.get("filters", []):
+                if f["filterType"] == "PRICE_FILTER":
+                    precision_info["tick_size"] = float(f.get("tickSize", 0))
+                elif f["filterType"] == "LOT_SIZE":
+                    precision_info["step_size"] = float(f.get("stepSize", 0))
+            
+            precision_cache[s["symbol"]] = precision_info
         
-        raise ValueError(f"Symbol {symbol} not found in exchange info")
+        self._precision_cache = precision_cache
+        self._formatters = {}
+        self._precision_fetched_at = time.monotonic()
 
-    def _format_value(self, value: float, precision: int, step: float = 0.0) -> str:
+    async def _get_formatters(
+        self, symbol: str
+    ) -> Tuple[Callable[[float], str], Callable[[float], str]]:
         """
-        Format a value to the correct precision.
+        Get price and quantity formatters for a symbol.
         
-        Args:
-            value: Value to format
-            precision: Number of decimal places
-            step: Step size (if provided, rounds to nearest step)
-            
         Returns:
-            Formatted string without trailing zeros
+            Tuple of (format_price, format_quantity), each rounding to the
+            symbol's tick/step size and stripping trailing zeros
         """
-        if step > 0:
-            # Round to nearest step
-            value = round(value / step) * step
-        
-        # Format to precision
-        formatted = f"{value:.{precision}f}"
-        
-        # Remove trailing zeros and decimal point if not needed
-        formatted = formatted.rstrip('0').rstrip('.')
-        
-        return formatted
+        precision = await self._get_precision(symbol)
+        formatters = self._formatters.get(symbol)
+        if formatters is None:
+            formatters = (
+                _make_formatter(precision["price_precision"], precision["tick_size"]),
+                _make_formatter(precision["quantity_precision"], precision["step_size"]),
+            )
+            self._formatters[symbol] = formatters
+        return formatters
 
     def _normalize_params(self, params: Dict) -> Dict:
         """
-        Recursively normalize parameters (sort keys, convert to strings).
+        Normalize parameters (convert scalar values to strings).
         
-        This is required for consistent signature generation.
+        This is required for consistent signature generation. Aster request
+        params are flat, and keys are sorted when the result is serialized.
         """
-        if isinstance(params, dict):
-            return {k: self._normalize_params(v) for k, v in sorted(params.items())}
-        elif isinstance(params, list):
-            return [self._normalize_params(item) for item in params]
-        elif isinstance(params, (int, float, bool)):
-            return str(params)
-        else:
-            return params
+        return {k: str(v) if isinstance(v, (int, float, bool)) else v for k, v in params.items()}
 
     async def _sign_request(self, params: Dict, nonce: int) -> Dict:
         """
@@ -154,42 +211,51 @@ class AsterToolkit(BaseDEXToolkit):
         1. Normalize params and convert to JSON string
         2. ABI encode (json_str, user, signer, nonce)
         3. Keccak256 hash
-        4. Sign with EIP-191 (encode_defunct)
+        4. Sign with EIP-191 (personal_sign of the 32-byte hash)
         
         Args:
             params: Request parameters
             nonce: Unique nonce (microsecond timestamp)
             
         Returns:
-            Parameters with signature, nonce, user, signer added
+            New dict of the parameters with signature, nonce, user, signer added
+            (params itself is left unchanged, so retries can re-sign it)
         """
         # Add timestamp and recvWindow
-        params["recvWindow"] = self.RECV_WINDOW
-        params["timestamp"] = str(int(time.time() * 1000))
+        params = {
+            **params,
+            "recvWindow": self.RECV_WINDOW,
+            "timestamp": str(time.time_ns() // 1_000_000),
+        }
         
-        # Normalize and serialize parameters
+        # Normalize and serialize parameters (compact, sorted keys)
         normalized = self._normalize_params(params)
-        json_str = json.dumps(normalized, separators=(',', ':'))
+        json_bytes = orjson.dumps(normalized, option=orjson.OPT_SORT_KEYS)
         
         # ABI encode: (string, address, address, uint256)
-        encoded = encode(
-            ['string', 'address', 'address', 'uint256'],
-            [json_str, self.user, self.signer, nonce]
-        )
+        # Fixed schema, so the head and the padded string tail are laid out directly
+        encoded = b"".join((
+            _ABI_STRING_OFFSET,
+            self._abi_addresses,
+            nonce.to_bytes(32, "big"),
+            len(json_bytes).to_bytes(32, "big"),
+            json_bytes,
+            bytes(-len(json_bytes) % 32),
+        ))
         
         # Keccak256 hash
-        keccak_hash = Web3.keccak(encoded)
-        
-        # Create EIP-191 signable message
-        signable_message = encode_defunct(hexstr=keccak_hash.hex())
+        keccak_hash = keccak(encoded)
         
-        # Sign with private key
-        signed_message = Account.sign_message(signable_message, private_key=self.account.key)
+        # Sign the EIP-191 message hash with the private key
+        message_hash = keccak(_EIP191_PREFIX_32 + keccak_hash)
+        # r || s || v with v in {0, 1}; Ethereum signatures use v + 27
+        raw_signature = self._signing_key.sign_msg_hash(message_hash).to_bytes()
+        signature = raw_signature[:64] + bytes((raw_signature[64] + 27,))
         
         # Add signature params
         params["user"] = self.user
         params["signer"] = self.signer
-        params["signature"] = '0x' + signed_message.signature.hex()
+        params["signature"] = '0x' + signature.hex()
         params["nonce"] = nonce
         
         return params
@@ -215,7 +281,7 @@ class AsterToolkit(BaseDEXToolkit):
             try:
                 # Generate nonce and sign
                 nonce = self._gen_nonce()
-                signed_params = await self._sign_request(params.copy(), nonce)
+                signed_params = await self._sign_request(params, nonce)
                 
                 # Make request based on method
                 if method == "POST":
@@ -226,7 +292,7 @@ class AsterToolkit(BaseDEXToolkit):
                     response = await self.client.get(url, params=signed_params)
                 
                 response.raise_for_status()
-                return response.json()
+                return orjson.loads(response.content)
                 
             except (httpx.TimeoutException, httpx.NetworkError) as e:
                 if attempt < max_retries - 1:
@@ -295,14 +361,36 @@ class AsterToolkit(BaseDEXToolkit):
         return positions
 
     async def get_market_price(self, symbol: str) -> float:
-        """Get current market price."""
+        """
+        Get current market price.
+        
+        The price may be up to PRICE_TTL seconds old, which is fine for the
+        1% limit-price offsets used when placing orders. Concurrent calls for
+        the same symbol share one request.
+        """
+        cached = self._price_cache.get(symbol)
+        if cached and time.monotonic() - cached[0] < self.PRICE_TTL:
+            return cached[1]
+        
+        task = self._price_inflight.get(symbol)
+        if task is None:
+            task = asyncio.create_task(self._fetch_market_price(symbol))
+            self._price_inflight[symbol] = task
+            task.add_done_callback(lambda _: self._price_inflight.pop(symbol, None))
+        # Shielded so one caller being cancelled does not fail the others
+        return await asyncio.shield(task)
+
+    async def _fetch_market_price(self, symbol: str) -> float:
+        """Fetch the current market price and cache it."""
         response = await self.client.get(
             f"{self.BASE_URL}/fapi/v3/ticker/price",
             params={"symbol": symbol}
         )
         response.raise_for_status()
-        data = response.json()
-        return float(data["price"])
+        data = orjson.loads(response.content)
+        price = float(data["price"])
+        self._price_cache[symbol] = (time.monotonic(), price)
+        return price
 
     async def get_klines(
         self, symbol: str, interval: str = "3m", limit: int = 100
@@ -313,7 +401,7 @@ class AsterToolkit(BaseDEXToolkit):
             params={"symbol": symbol, "interval": interval, "limit": limit}
         )
         response.raise_for_status()
-        data = response.json()
+        data = orjson.loads(response.content)
         
         # Convert to standardized format
         klines = []
@@ -361,116 +449,87 @@ class AsterToolkit(BaseDEXToolkit):
             logger.warning("Cannot place TP/SL orders due to non-positive quantity or entry price")
             return results
 
-        precision = await self._get_precision(symbol)
-        qty_str = self._format_value(
-            quantity,
-            precision["quantity_precision"],
-            precision["step_size"],
-        )
+        format_price, format_quantity = await self._get_formatters(symbol)
+        qty_str = format_quantity(quantity)
 
         def _position_side() -> str:
             if not self.hedge_mode:
                 return "BOTH"
             return "LONG" if side == "long" else "SHORT"
 
+        # (result key, label, trigger price, order type) for each protective order
+        orders = []
+        
         # Take-profit order
         if take_profit_pct and take_profit_pct > 0:
             if side == "long":
                 tp_price = entry_price * (1 + take_profit_pct / 100)
-                order_side = "SELL"
             else:
                 tp_price = entry_price * (1 - take_profit_pct / 100)
-                order_side = "BUY"
-
-            if tp_price > 0:
-                stop_price_str = self._format_value(
-                    tp_price,
-                    precision["price_precision"],
-                    precision["tick_size"],
-                )
-                params = {
-                    "symbol": symbol,
-                    "side": order_side,
-                    "type": "TAKE_PROFIT_MARKET",
-                    "stopPrice": stop_price_str,
-                    "quantity": qty_str,
-                    "reduceOnly": "true",
-                }
-                if self.hedge_mode:
-                    params["positionSide"] = _position_side()
-
-                try:
-                    result = await self._request("POST", "/fapi/v3/order", params)
-                    results["take_profit"] = result
-                    logger.info(
-                        f"Placed take-profit for {symbol} {side}: stopPrice={stop_price_str}, quantity={qty_str}"
-                    )
-                except Exception as exc:  # pragma: no cover - runtime safety
-                    logger.error(f"Failed to place take-profit order: {exc}")
+            orders.append(("take_profit", "take-profit", tp_price, "TAKE_PROFIT_MARKET"))
 
         # Stop-loss order
         if stop_loss_pct and stop_loss_pct > 0:
             if side == "long":
                 sl_price = entry_price * (1 - stop_loss_pct / 100)
-                order_side = "SELL"
             else:
                 sl_price = entry_price * (1 + stop_loss_pct / 100)
-                order_side = "BUY"
+            orders.append(("stop_loss", "stop-loss", sl_price, "STOP_MARKET"))
+
+        order_side = "SELL" if side == "long" else "BUY"
 
-            if sl_price > 0:
-                stop_price_str = self._format_value(
-                    sl_price,
-                    precision["price_precision"],
-                    precision["tick_size"],
+        async def _place(label: str, params: Dict) -> Optional[Dict]:
+            try:
+                result = await self._request("POST", "/fapi/v3/order", params)
+                logger.info(
+                    f"Placed {label} for {symbol} {side}: stopPrice={params['stopPrice']}, quantity={qty_str}"
                 )
-                params = {
-                    "symbol": symbol,
-                    "side": order_side,
-                    "type": "STOP_MARKET",
-                    "stopPrice": stop_price_str,
-                    "quantity": qty_str,
-                    "reduceOnly": "true",
-                }
-                if self.hedge_mode:
-                    params["positionSide"] = _position_side()
-
-                try:
-                    result = await self._request("POST", "/fapi/v3/order", params)
-                    results["stop_loss"] = result
-                    logger.info(
-                        f"Placed stop-loss for {symbol} {side}: stopPrice={stop_price_str}, quantity={qty_str}"
-                    )
-                except Exception as exc:  # pragma: no cover - runtime safety
-                    logger.error(f"Failed to place stop-loss order: {exc}")
+                return result
+            except Exception as exc:  # pragma: no cover - runtime safety
+                logger.error(f"Failed to place {label} order: {exc}")
+                return None
+
+        # Sign and send TP and SL together rather than one after the other
+        pending = []
+        for key, label, stop_price, order_type in orders:
+            if stop_price <= 0:
+                continue
+            params = {
+                "symbol": symbol,
+                "side": order_side,
+                "type": order_type,
+                "stopPrice": format_price(stop_price),
+                "quantity": qty_str,
+                "reduceOnly": "true",
+            }
+            if self.hedge_mode:
+                params["positionSide"] = _position_side()
+            pending.append((key, _place(label, params)))
+
+        placed = await asyncio.gather(*(coro for _, coro in pending))
+        for (key, _), result in zip(pending, placed):
+            if result is not None:
+                results[key] = result
 
         return results
 
     async def open_long(self, symbol: str, quantity: float, leverage: int) -> Dict:
         """Open a long position."""
-        # Cancel any existing orders
-        await self._cancel_all_orders(symbol)
-        
-        # Set leverage
-        await self._set_leverage(symbol, leverage)
-        
-        # Get current price and precision
-        price = await self.get_market_price(symbol)
-        precision = await self._get_precision(symbol)
+        # Cancel any existing orders, set leverage, and get current price and
+        # precision concurrently; only the order itself depends on all of them
+        _, _, price, (format_price, format_quantity) = await asyncio.gather(
+            self._cancel_all_orders(symbol),
+            self._set_leverage(symbol, leverage),
+            self.get_market_price(symbol),
+            self._get_formatters(symbol),
+        )
         
         # Use limit order at slightly higher price to ensure fill
         limit_price = price * 1.01
         
         # Format price and quantity
-        price_str = self._format_value(
-            limit_price,
-            precision["price_precision"],
-            precision["tick_size"]
-        )
-        qty_str = self._format_value(
-            quantity,
-            precision["quantity_precision"],
-            precision["step_size"]
-        )
+        price_str = format_price(limit_price)
+        qty_str = format_quantity(quantity)
         
         logger.info(f"Opening LONG {symbol}: quantity={qty_str}, price={price_str}, leverage={leverage}x")
         
@@ -502,25 +561,18 @@ class AsterToolkit(BaseDEXToolkit):
 
     async def open_short(self, symbol: str, quantity: float, leverage: int) -> Dict:
         """Open a short position."""
-        await self._cancel_all_orders(symbol)
-        await self._set_leverage(symbol, leverage)
-        
-        price = await self.get_market_price(symbol)
-        precision = await self._get_precision(symbol)
+        _, _, price, (format_price, format_quantity) = await asyncio.gather(
+            self._cancel_all_orders(symbol),
+            self._set_leverage(symbol, leverage),
+            self.get_market_price(symbol),
+            self._get_formatters(symbol),
+        )
         
         # Use limit order at slightly lower price
         limit_price = price * 0.99
         
-        price_str = self._format_value(
-            limit_price,
-            precision["price_precision"],
-            precision["tick_size"]
-        )
-        qty_str = self._format_value(
-            quantity,
-            precision["quantity_precision"],
-            precision["step_size"]
-        )
+        price_str = format_price(limit_price)
+        qty_str = format_quantity(quantity)
         
         logger.info(f"Opening SHORT {symbol}: quantity={qty_str}, price={price_str}, leverage={leverage}x")
         
@@ -552,34 +604,30 @@ class AsterToolkit(BaseDEXToolkit):
 
     async def close_position(self, symbol: str, side: str, quantity: float | None = None) -> Dict:
         """Close an existing position. Optional partial quantity supported."""
-        # Get current position
-        positions = await self.get_positions()
+        # Get current position, price and precision concurrently
+        positions, price, (format_price, format_quantity) = await asyncio.gather(
+            self.get_positions(),
+            self.get_market_price(symbol),
+            self._get_formatters(symbol),
+        )
         position = next((p for p in positions if p["symbol"] == symbol and p["side"] == side), None)
         
         if not position:
             raise ValueError(f"No {side} position found for {symbol}")
         
         position_amt = position["position_amt"]
-        target_qty = position_amt if quantity is None else min(abs(quantity), position_amt)
-        if target_qty <= 0:
+        # Fully closed exactly when the whole position amount is targeted
+        fully_closed = quantity is None or abs(quantity) >= position_amt
+        target_qty = position_amt if fully_closed else abs(quantity)
+        if math.isnan(target_qty) or target_qty <= 0:
             raise ValueError("Close quantity must be positive")
-        price = await self.get_market_price(symbol)
-        precision = await self._get_precision(symbol)
         
         # Opposite side to close
         order_side = "SELL" if side == "long" else "BUY"
         limit_price = price * 0.99 if side == "long" else price * 1.01
         
-        price_str = self._format_value(
-            limit_price,
-            precision["price_precision"],
-            precision["tick_size"]
-        )
-        qty_str = self._format_value(
-            target_qty,
-            precision["quantity_precision"],
-            precision["step_size"]
-        )
+        price_str = format_price(limit_price)
+        qty_str = format_quantity(target_qty)
         
         logger.info(f"Closing {side.upper()} {symbol}: quantity={qty_str}")
         
@@ -603,7 +651,7 @@ class AsterToolkit(BaseDEXToolkit):
         result = await self._request("POST", "/fapi/v3/order", order_params)
         
         # Cancel remaining orders
-        if abs(target_qty - position_amt) < 1e-9:
+        if fully_closed:
             await self._cancel_all_orders(symbol)
         
         return {
@@ -612,7 +660,7 @@ class AsterToolkit(BaseDEXToolkit):
             "closed_side": side,
             "quantity": qty_str,
             "closed_quantity": target_qty,
-            "fully_closed": abs(target_qty - position_amt) < 1e-9,
+            "fully_closed": fully_closed,
             "status": result.get("status"),
         }
 
@@ -661,14 +709,19 @@ class AsterToolkit(BaseDEXToolkit):
             all_trades = []
             symbols = ["BTCUSDT", "ETHUSDT", "SOLUSDT", "BNBUSDT", "DOGEUSDT", "XRPUSDT"]
             
-            for sym in symbols:
-                try:
-                    params["symbol"] = sym
-                    trades = await self._request("GET", "/fapi/v1/userTrades", params)
-                    all_trades.extend(trades)
-                except Exception as e:
-                    logger.debug(f"No trades found for {sym}: {e}")
+            # Symbols are independent, so query them concurrently
+            results = await asyncio.gather(
+                *(
+                    self._request("GET", "/fapi/v1/userTrades", {**params, "symbol": sym})
+                    for sym in symbols
+                ),
+                return_exceptions=True,
+            )
+            for sym, trades in zip(symbols, results):
+                if isinstance(trades, Exception):
+                    logger.debug(f"No trades found for {sym}: {trades}")
                     continue
+                all_trades.extend(trades)
             
             data = all_trades
         
@@ -693,7 +746,7 @@ class AsterToolkit(BaseDEXToolkit):
             })
         
         # Sort by time (newest first)
-        trades.sort(key=lambda x: x["time"], reverse=True)
+        trades.sort(key=itemgetter("time"), reverse=True)
         
         return trades
 
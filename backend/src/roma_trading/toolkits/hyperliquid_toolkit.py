@@ -5,23 +5,50 @@ This toolkit provides full trading functionality for Hyperliquid perpetual futur
 mapping SDK responses to normalized internal format compatible with Aster toolkit.
 """
 
+import math
 import time
 import asyncio
-from typing import Dict, List, Optional
+import threading
+from collections import defaultdict
+from importlib.util import find_spec
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple
+import orjson
 from loguru import logger
 
-try:
-    import eth_account
+from .base_dex import BaseDEXToolkit
+
+if TYPE_CHECKING:
     from eth_account.signers.local import LocalAccount
-    from hyperliquid.info import Info
-    from hyperliquid.exchange import Exchange
-    from hyperliquid.utils import constants
-    HYPERLIQUID_AVAILABLE = True
-except ImportError:
-    HYPERLIQUID_AVAILABLE = False
+    from hyperliquid.websocket_manager import WebsocketManager
+
+# The SDK (with requests and websocket-client) is imported on first toolkit
+# construction, so processes that never trade on Hyperliquid skip loading it
+HYPERLIQUID_AVAILABLE = find_spec("hyperliquid") is not None
+if not HYPERLIQUID_AVAILABLE:
     logger.warning("hyperliquid-python-sdk not installed. HyperliquidToolkit will not work.")
 
-from .base_dex import BaseDEXToolkit
+eth_account = Info = Exchange = constants = WebsocketManager = HTTPAdapter = None
+
+
+def _import_sdk() -> None:
+    """Import the Hyperliquid SDK into module globals (once)."""
+    global eth_account, Info, Exchange, constants, WebsocketManager, HTTPAdapter
+    if Info is not None:
+        return
+    try:
+        import eth_account as _eth_account
+        from hyperliquid.info import Info as _Info
+        from hyperliquid.exchange import Exchange as _Exchange
+        from hyperliquid.utils import constants as _constants
+        from hyperliquid.websocket_manager import WebsocketManager as _WebsocketManager
+        from requests.adapters import HTTPAdapter as _HTTPAdapter
+    except ImportError as e:
+        raise ImportError(
+            "hyperliquid-python-sdk is required. Install with: pip install hyperliquid-python-sdk"
+        ) from e
+    eth_account, Exchange, constants = _eth_account, _Exchange, _constants
+    WebsocketManager, HTTPAdapter = _WebsocketManager, _HTTPAdapter
+    Info = _Info
 
 
 # Symbol mapping: internal format (BTCUSDT) -> Hyperliquid format (BTC)
@@ -36,6 +63,71 @@ SYMBOL_MAP = {
 
 REVERSE_SYMBOL_MAP = {v: k for k, v in SYMBOL_MAP.items()}
 
+# Candle interval lengths in milliseconds (Hyperliquid supports these and more)
+INTERVAL_MS = {
+    "1m": 60 * 1000,
+    "3m": 3 * 60 * 1000,
+    "5m": 5 * 60 * 1000,
+    "15m": 15 * 60 * 1000,
+    "1h": 60 * 60 * 1000,
+    "4h": 4 * 60 * 60 * 1000,
+    "1d": 24 * 60 * 60 * 1000,
+}
+
+
+def _make_price_formatter(price_decimals: int) -> Callable[[float], float]:
+    """
+    Build a price formatter specialized to a fixed number of price decimals.
+    
+    Applies Hyperliquid's tick rule: integers above 100k, else 5 significant
+    figures capped at ``price_decimals`` decimals. The 5-sig-fig step goes
+    through ``format`` on purpose: CPython's ``round(x, n)`` is itself
+    dtoa-based, so a log10-based rounding is both slower and no more exact.
+    
+    Args:
+        price_decimals: Max decimals (6 for perps, 8 for spot, minus szDecimals)
+        
+    Returns:
+        Function rounding a price to a value Hyperliquid accepts
+    """
+    def format_price(price: float) -> float:
+        if price > 100_000:
+            return round(price)
+        return round(float(f"{price:.5g}"), price_decimals)
+    
+    return format_price
+
+
+# Unknown assets fall back to perp rules with max 6 decimals
+_format_fallback_price = _make_price_formatter(6)
+
+
+def _decode_with_orjson(response, *args, **kwargs):
+    """requests response hook: make ``response.json()`` decode with orjson."""
+    response.json = lambda **_: orjson.loads(response.content)
+    return response
+
+
+def _pick_float(field: str, *candidates) -> float:
+    """
+    Parse the first non-empty candidate as a float.
+    
+    Args:
+        field: Name used in the warning when the value cannot be parsed
+        *candidates: Values in priority order (Hyperliquid sends numeric strings)
+        
+    Returns:
+        Parsed value, or 0.0 when every candidate is empty or the pick is invalid
+    """
+    for value in candidates:
+        if value:
+            try:
+                return float(value)
+            except (ValueError, TypeError):
+                logger.warning(f"Failed to parse {field}: {value}")
+                return 0.0
+    return 0.0
+
 
 class HyperliquidToolkit(BaseDEXToolkit):
     """
@@ -45,15 +137,24 @@ class HyperliquidToolkit(BaseDEXToolkit):
     - EIP-191 message signing via SDK
     - Automatic symbol mapping
     - Full perpetual futures support
+    - Prices and account state pushed over WebSocket, with REST fallback
     """
     
+    WS_MAX_AGE = 5.0  # seconds a pushed snapshot is trusted before falling back to REST
+    WS_SETTLE = 1.0  # seconds pushed user state is ignored after a local order (may predate the fill)
+    WS_RECONNECT_INTERVAL = 30.0  # minimum seconds between websocket (re)connect attempts
+    USER_STATE_TTL = 0.25  # seconds a REST user_state response is shared between callers
+    META_TTL = 3600.0  # seconds before perp/spot meta is refetched (new listings)
+    HTTP_POOL_SIZE = 32  # keep-alive connections to the API host shared by all SDK clients
+    
     def __init__(
         self,
         api_key: str,
         api_secret: str,
         account_id: Optional[str] = None,
         testnet: bool = False,
-        hedge_mode: bool = False
+        hedge_mode: bool = False,
+        use_websocket: bool = False,
     ):
         """
         Initialize Hyperliquid toolkit.
@@ -68,6 +169,10 @@ class HyperliquidToolkit(BaseDEXToolkit):
                        If None, will use wallet address derived from api_secret (not recommended).
             testnet: Whether to use testnet
             hedge_mode: Whether account uses hedge mode (default: False)
+            use_websocket: Serve mid prices and user state from WebSocket
+                       subscriptions instead of polling REST (default: False).
+                       Runs two background threads per toolkit and
+                       reconnects after a dropped connection.
         
         Note:
             Hyperliquid uses two addresses:
@@ -76,8 +181,7 @@ class HyperliquidToolkit(BaseDEXToolkit):
             
             Always set account_id to your MAIN wallet address to query correct balance.
         """
-        if not HYPERLIQUID_AVAILABLE:
-            raise ImportError("hyperliquid-python-sdk is required. Install with: pip install hyperliquid-python-sdk")
+        _import_sdk()
         
         self.testnet = testnet
         self.hedge_mode = hedge_mode
@@ -91,7 +195,7 @@ class HyperliquidToolkit(BaseDEXToolkit):
         else:
             secret_key = "0x" + api_secret
         
-        self.wallet: LocalAccount = eth_account.Account.from_key(secret_key)
+        self.wallet: "LocalAccount" = eth_account.Account.from_key(secret_key)
         
         # Use account_id if provided, otherwise use wallet address
         self.account_address = account_id or self.wallet.address
@@ -104,6 +208,17 @@ class HyperliquidToolkit(BaseDEXToolkit):
             account_address=self.account_address
         )
         
+        # Info, Exchange and the Exchange's own Info each open a requests
+        # session with a 10-connection pool. Share one larger keep-alive pool
+        # so requests fanned out over worker threads reuse warm TLS
+        # connections instead of discarding and re-handshaking them.
+        session = self.info.session
+        session.mount("https://", HTTPAdapter(pool_maxsize=self.HTTP_POOL_SIZE))
+        # The SDK parses every response with response.json() (stdlib json)
+        session.hooks["response"].append(_decode_with_orjson)
+        self.exchange.session = session
+        self.exchange.info.session = session
+        
         logger.info(
             f"Initialized HyperliquidToolkit: account_address={self.account_address}, "
             f"wallet_address={self.wallet.address}, "
@@ -115,31 +230,222 @@ class HyperliquidToolkit(BaseDEXToolkit):
         else:
             logger.info(f"Using wallet address as account address: {self.wallet.address}")
         
-        # Cache for symbol precision (Hyperliquid uses szDecimals)
-        self._precision_cache: Dict[str, int] = {}
+        # Asset maps loaded by Info at construction, refreshed every META_TTL
+        self._bind_meta()
+        self._meta_fetched_at = time.monotonic()
+        self._meta_lock = asyncio.Lock()
+        
+        # Serializes leverage checks and updates per Hyperliquid coin
+        self._leverage_locks: Dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+        
+        # Per-symbol (size_decimals, price_decimals, is_spot), keyed by internal symbol
+        self._asset_meta: Dict[str, Tuple[int, int, bool]] = {}
+        # Per-symbol price formatters built from _asset_meta
+        self._price_formatters: Dict[str, Callable[[float], float]] = {}
+        
+        # Latest pushed snapshots and when they arrived (monotonic time)
+        self._mids: Dict[str, str] = {}
+        self._mids_at = 0.0
+        self._ws_user_state: Optional[Dict] = None
+        self._ws_user_state_at = 0.0
+        # Pushes arriving before this (monotonic) time are dropped; guarded by _ws_state_lock
+        # so a push racing an invalidation cannot restore pre-fill state
+        self._ws_settle_until = 0.0
+        self._ws_state_lock = threading.Lock()
+        self._ws: Optional["WebsocketManager"] = None
+        self._ws_base_url = base_url if use_websocket else None
+        self._ws_started_at = 0.0
+        
+        # Short-lived REST user_state snapshot (monotonic time, payload), single-flight
+        self._user_state_cache: Optional[Tuple[float, Dict]] = None
+        self._user_state_lock = asyncio.Lock()
+        if use_websocket:
+            self._start_websocket()
+    
+    def _start_websocket(self) -> None:
+        """Subscribe to allMids and webData2 so reads are served from memory."""
+        self._ws_started_at = time.monotonic()
+        try:
+            self._ws = WebsocketManager(self._ws_base_url)
+            # Daemon threads (socket and keepalive ping) so an unclosed toolkit does not block interpreter exit
+            self._ws.daemon = True
+            self._ws.ping_sender.daemon = True
+            self._ws.start()
+            self._ws.subscribe({"type": "allMids"}, self._on_mids)
+            self._ws.subscribe({"type": "webData2", "user": self.account_address}, self._on_web_data)
+        except Exception as e:
+            logger.warning(f"Hyperliquid websocket unavailable, using REST only: {e}")
+            self._ws = None
+    
+    def _check_websocket(self) -> None:
+        """Restart the websocket if its connection dropped (the manager thread exits)."""
+        ws = self._ws
+        if self._ws_base_url is None or (ws is not None and ws.is_alive()):
+            return
+        if time.monotonic() - self._ws_started_at < self.WS_RECONNECT_INTERVAL:
+            return
+        if ws is not None:
+            try:
+                # Ends the keepalive ping thread of the dead connection
+                ws.stop()
+            except Exception:
+                pass
+        logger.info("Reconnecting Hyperliquid websocket")
+        self._start_websocket()
+    
+    def _on_mids(self, msg: Dict) -> None:
+        """Store pushed mid prices (runs on the websocket thread)."""
+        self._mids = msg["data"]["mids"]
+        self._mids_at = time.monotonic()
+    
+    def _on_web_data(self, msg: Dict) -> None:
+        """Store the pushed clearinghouse state (runs on the websocket thread)."""
+        state = msg["data"].get("clearinghouseState")
+        if state is None:
+            return
+        with self._ws_state_lock:
+            now = time.monotonic()
+            if now < self._ws_settle_until:
+                return
+            self._ws_user_state = state
+            self._ws_user_state_at = now
+    
+    async def _all_mids(self) -> Dict[str, str]:
+        """Mid prices by coin, from the websocket snapshot when fresh."""
+        if time.monotonic() - self._mids_at < self.WS_MAX_AGE:
+            return self._mids
+        self._check_websocket()
+        return await asyncio.to_thread(self.info.all_mids)
+    
+    async def _user_state(self) -> Dict:
+        """
+        Clearinghouse state of the account.
+        
+        Served from the websocket snapshot when fresh, otherwise from a REST
+        response shared for USER_STATE_TTL so that balance and position reads
+        in the same tick (and concurrent callers) cost one request.
+        """
+        ws_state = self._ws_user_state
+        if ws_state is not None and time.monotonic() - self._ws_user_state_at < self.WS_MAX_AGE:
+            return ws_state
+        self._check_websocket()
+        
+        cached = self._user_state_cache
+        if cached is not None and time.monotonic() - cached[0] < self.USER_STATE_TTL:
+            return cached[1]
+        
+        async with self._user_state_lock:
+            # Another caller may have refreshed while we waited
+            cached = self._user_state_cache
+            if cached is not None and time.monotonic() - cached[0] < self.USER_STATE_TTL:
+                return cached[1]
+            user_state = await asyncio.to_thread(self.info.user_state, self.account_address)
+            self._user_state_cache = (time.monotonic(), user_state)
+            return user_state
+    
+    def _invalidate_user_state(self) -> None:
+        """
+        Drop the cached user state so the next read sees post-order balances.
+        
+        Pushed state is also ignored for WS_SETTLE, since a push already in
+        flight when the order filled would otherwise restore pre-fill state.
+        """
+        self._user_state_cache = None
+        with self._ws_state_lock:
+            self._ws_settle_until = time.monotonic() + self.WS_SETTLE
+            self._ws_user_state = None
+    
+    def _bind_meta(self) -> None:
+        """Bind the SDK's asset maps so hot paths skip the Info attribute hop."""
+        self._name_to_coin: Dict[str, str] = self.info.name_to_coin
+        self._coin_to_asset: Dict[str, int] = self.info.coin_to_asset
+        self._asset_to_sz_decimals: Dict[int, int] = self.info.asset_to_sz_decimals
+    
+    async def _refresh_meta(self) -> None:
+        """Refetch asset metadata once META_TTL has elapsed."""
+        fetched_at = self._meta_fetched_at
+        if time.monotonic() - fetched_at < self.META_TTL:
+            return
+        
+        # Single-flight: concurrent callers wait for one meta fetch
+        async with self._meta_lock:
+            if self._meta_fetched_at == fetched_at:
+                await self._load_meta()
+    
+    async def _load_meta(self) -> None:
+        """Fetch perp and spot meta and rebuild the asset maps of Info and Exchange."""
+        try:
+            meta, spot_meta = await asyncio.gather(
+                asyncio.to_thread(self.info.meta),
+                asyncio.to_thread(self.info.spot_meta),
+            )
+            # Info builds its maps from the given meta without further requests
+            fresh = Info(self.info.base_url, skip_ws=True, meta=meta, spot_meta=spot_meta)
+        except Exception as e:
+            logger.warning(f"Failed to refresh Hyperliquid meta, keeping cached maps: {e}")
+        else:
+            for info in (self.info, self.exchange.info):
+                info.name_to_coin = fresh.name_to_coin
+                info.coin_to_asset = fresh.coin_to_asset
+                info.asset_to_sz_decimals = fresh.asset_to_sz_decimals
+            self._bind_meta()
+            self._asset_meta = {}
+            self._price_formatters = {}
+        self._meta_fetched_at = time.monotonic()
     
     def _normalize_symbol(self, symbol: str) -> str:
         """Convert internal symbol (BTCUSDT) to Hyperliquid format (BTC)."""
-        return SYMBOL_MAP.get(symbol, symbol.replace("USDT", ""))
+        # Mapped symbols skip building the fallback string entirely
+        mapped = SYMBOL_MAP.get(symbol)
+        if mapped is not None:
+            return mapped
+        return symbol.removesuffix("USDT")
     
     def _denormalize_symbol(self, symbol: str) -> str:
         """Convert Hyperliquid symbol (BTC) to internal format (BTCUSDT)."""
-        return REVERSE_SYMBOL_MAP.get(symbol, symbol + "USDT")
+        mapped = REVERSE_SYMBOL_MAP.get(symbol)
+        if mapped is not None:
+            return mapped
+        return symbol + "USDT"
     
-    def _get_precision(self, symbol: str) -> int:
-        """Get size decimals for a symbol (cached)."""
+    def _get_asset_meta(self, symbol: str) -> Optional[Tuple[int, int, bool]]:
+        """
+        Resolve (size_decimals, price_decimals, is_spot) for a symbol once.
+        
+        Args:
+            symbol: Internal symbol (e.g. BTCUSDT)
+        
+        Returns:
+            Cached tuple, or None when the asset is not in the exchange meta
+        """
+        meta = self._asset_meta.get(symbol)
+        if meta is not None:
+            return meta
+        
         normalized = self._normalize_symbol(symbol)
-        if normalized in self._precision_cache:
-            return self._precision_cache[normalized]
+        coin = self._name_to_coin.get(normalized, normalized)
+        asset = self._coin_to_asset.get(coin)
+        if asset is None:
+            return None
         
-        # Get precision from meta
+        # Spot assets start at 10000 and allow 8 price decimals; perps allow 6
+        is_spot = asset >= 10_000
+        max_decimals = 8 if is_spot else 6
+        sz_decimals = self._asset_to_sz_decimals.get(asset)
+        meta = (
+            8 if sz_decimals is None else sz_decimals,
+            max_decimals - (sz_decimals or 0),
+            is_spot,
+        )
+        self._asset_meta[symbol] = meta
+        return meta
+    
+    def _get_precision(self, symbol: str) -> int:
+        """Get size decimals for a symbol (cached)."""
         try:
-            coin = self.info.name_to_coin.get(normalized, normalized)
-            asset = self.info.coin_to_asset.get(coin)
-            if asset is not None:
-                decimals = self.info.asset_to_sz_decimals.get(asset, 8)
-                self._precision_cache[normalized] = decimals
-                return decimals
+            meta = self._get_asset_meta(symbol)
+            if meta is not None:
+                return meta[0]
         except Exception as e:
             logger.warning(f"Failed to get precision for {symbol}: {e}")
         
@@ -159,48 +465,32 @@ class HyperliquidToolkit(BaseDEXToolkit):
         
         Returns formatted price that Hyperliquid will accept.
         """
+        format_price = self._price_formatters.get(symbol)
+        if format_price is not None:
+            return format_price(price)
+        
         try:
-            normalized = self._normalize_symbol(symbol)
-            coin = self.info.name_to_coin.get(normalized, normalized)
-            asset = self.info.coin_to_asset.get(coin)
-            
-            if asset is None:
-                # Fallback: if price > 100k, round to integer; otherwise 5 sig figs, max 6 decimals
-                if price > 100_000:
-                    return round(price)
-                return round(float(f"{price:.5g}"), 6)
-            
-            # Check if spot (spot assets start at 10000)
-            is_spot = asset >= 10_000
-            max_decimals = 8 if is_spot else 6
-            
-            sz_decimals = self.info.asset_to_sz_decimals.get(asset, 0)
-            price_decimals = max_decimals - sz_decimals
-            
-            # If price > 100,000, round to integer (always allowed)
-            if price > 100_000:
-                return round(price)
-            
-            # Format to 5 significant figures first, then round to price_decimals
-            formatted = round(float(f"{price:.5g}"), price_decimals)
-            
-            return formatted
-            
+            meta = self._get_asset_meta(symbol)
+            if meta is None:
+                return _format_fallback_price(price)
+            format_price = _make_price_formatter(meta[1])
+            self._price_formatters[symbol] = format_price
+            return format_price(price)
         except Exception as e:
             logger.warning(f"Failed to format price for {symbol}: {e}, using fallback")
-            # Fallback: if price > 100k, round to integer; otherwise 5 sig figs, max 6 decimals
-            if price > 100_000:
-                return round(price)
-            return round(float(f"{price:.5g}"), 6)
+            return _format_fallback_price(price)
     
     async def get_account_balance(self) -> Dict:
         """Get account balance information."""
         try:
             logger.debug(f"Fetching account balance for address: {self.account_address}")
-            user_state = self.info.user_state(self.account_address)
+            user_state = await self._user_state()
             
             # Debug: log the raw response structure
-            logger.debug(f"User state keys: {list(user_state.keys()) if isinstance(user_state, dict) else 'Not a dict'}")
+            logger.opt(lazy=True).debug(
+                "User state keys: {}",
+                lambda: list(user_state.keys()) if isinstance(user_state, dict) else "Not a dict",
+            )
             
             # Hyperliquid user_state structure may vary
             # Try different possible structures
@@ -209,43 +499,24 @@ class HyperliquidToolkit(BaseDEXToolkit):
                 # Alternative structure: check if marginSummary is at top level
                 margin_summary = user_state if isinstance(user_state, dict) else {}
             
-            # Account value - Hyperliquid returns as string
-            account_value_str = (
-                margin_summary.get("accountValue") or 
-                margin_summary.get("account_value") or 
-                user_state.get("accountValue") or 
-                "0"
+            # Account value, margin used and withdrawable - Hyperliquid returns strings
+            account_value = _pick_float(
+                "accountValue",
+                margin_summary.get("accountValue"),
+                margin_summary.get("account_value"),
+                user_state.get("accountValue"),
             )
-            try:
-                account_value = float(str(account_value_str)) if account_value_str else 0.0
-            except (ValueError, TypeError):
-                logger.warning(f"Failed to parse accountValue: {account_value_str}")
-                account_value = 0.0
-            
-            # Total margin used - Hyperliquid returns as string
-            total_margin_used_str = (
-                margin_summary.get("totalMarginUsed") or
-                margin_summary.get("total_margin_used") or
-                margin_summary.get("marginUsed") or
-                "0"
+            total_margin_used = _pick_float(
+                "totalMarginUsed",
+                margin_summary.get("totalMarginUsed"),
+                margin_summary.get("total_margin_used"),
+                margin_summary.get("marginUsed"),
             )
-            try:
-                total_margin_used = float(str(total_margin_used_str)) if total_margin_used_str else 0.0
-            except (ValueError, TypeError):
-                logger.warning(f"Failed to parse totalMarginUsed: {total_margin_used_str}")
-                total_margin_used = 0.0
-            
-            # Withdrawable balance - Hyperliquid returns as string
-            withdrawable_str = (
-                user_state.get("withdrawable") or
-                margin_summary.get("withdrawable") or
-                "0"
+            withdrawable = _pick_float(
+                "withdrawable",
+                user_state.get("withdrawable"),
+                margin_summary.get("withdrawable"),
             )
-            try:
-                withdrawable = float(str(withdrawable_str)) if withdrawable_str else 0.0
-            except (ValueError, TypeError):
-                logger.warning(f"Failed to parse withdrawable: {withdrawable_str}")
-                withdrawable = 0.0
             
             # Calculate unrealized PnL from positions
             unrealized_profit = 0.0
@@ -291,56 +562,55 @@ class HyperliquidToolkit(BaseDEXToolkit):
                 "total_unrealized_profit": unrealized_profit,
             }
         except Exception as e:
-            logger.error(f"Failed to get account balance for {self.account_address}: {e}", exc_info=True)
-            # Log the raw response for debugging
-            try:
-                user_state = self.info.user_state(self.account_address)
-                logger.error(f"User state response: {user_state}")
-            except:
-                pass
+            logger.error(f"Failed to get account balance for {self.account_address}: {e}")
+            # Log the last response for debugging
+            if self._user_state_cache is not None:
+                logger.error(f"User state response: {self._user_state_cache[1]}")
             raise
     
     async def get_positions(self) -> List[Dict]:
         """Get current open positions."""
         try:
-            user_state = self.info.user_state(self.account_address)
+            user_state = await self._user_state()
             positions = []
             
             for asset_pos in user_state.get("assetPositions", []):
                 pos = asset_pos.get("position", {})
-                szi = float(pos.get("szi", "0"))
+                get = pos.get
+                szi = float(get("szi", "0"))
+                abs_szi = abs(szi)
                 
                 # Skip empty positions
-                if abs(szi) < 1e-10:
+                if abs_szi < 1e-10:
                     continue
                 
                 # Determine side
                 side = "long" if szi > 0 else "short"
                 
-                coin = pos.get("coin", "")
+                coin = get("coin", "")
                 symbol = self._denormalize_symbol(coin)
                 
-                entry_px = float(pos.get("entryPx", "0")) if pos.get("entryPx") else 0.0
-                leverage_obj = pos.get("leverage", {})
-                leverage_value = int(float(leverage_obj.get("value", "1")))
+                # Missing or empty prices (no liquidation price, etc.) read as 0
+                entry_px = float(get("entryPx") or 0)
+                leverage_value = int(float(get("leverage", {}).get("value", "1")))
                 
-                liquidation_px = float(pos.get("liquidationPx", "0")) if pos.get("liquidationPx") else 0.0
-                unrealized_pnl = float(pos.get("unrealizedPnl", "0"))
-                position_value = float(pos.get("positionValue", "0"))
+                liquidation_px = float(get("liquidationPx") or 0)
+                unrealized_pnl = float(get("unrealizedPnl", "0"))
+                position_value = float(get("positionValue", "0"))
                 
                 # Calculate mark price from position value and size
-                if abs(szi) > 1e-10:
-                    mark_price = abs(position_value / szi)
+                if abs_szi > 1e-10:
+                    mark_price = abs(position_value) / abs_szi
                 else:
                     # Fallback: get from all_mids
-                    mids = self.info.all_mids()
-                    coin_key = self.info.name_to_coin.get(coin, coin)
+                    mids = await self._all_mids()
+                    coin_key = self._name_to_coin.get(coin, coin)
                     mark_price = float(mids.get(coin_key, "0"))
                 
                 positions.append({
                     "symbol": symbol,
                     "side": side,
-                    "position_amt": abs(szi),
+                    "position_amt": abs_szi,
                     "entry_price": entry_px,
                     "mark_price": mark_price,
                     "unrealized_profit": unrealized_pnl,
@@ -350,21 +620,21 @@ class HyperliquidToolkit(BaseDEXToolkit):
             
             return positions
         except Exception as e:
-            logger.error(f"Failed to get positions: {e}", exc_info=True)
+            logger.error(f"Failed to get positions: {e}")
             raise
     
     async def get_market_price(self, symbol: str) -> float:
         """Get current market price."""
         try:
             normalized = self._normalize_symbol(symbol)
-            coin_key = self.info.name_to_coin.get(normalized, normalized)
-            mids = self.info.all_mids()
+            coin_key = self._name_to_coin.get(normalized, normalized)
+            mids = await self._all_mids()
             price = float(mids.get(coin_key, "0"))
             if price == 0:
                 raise ValueError(f"Price not found for {symbol}")
             return price
         except Exception as e:
-            logger.error(f"Failed to get market price for {symbol}: {e}", exc_info=True)
+            logger.error(f"Failed to get market price for {symbol}: {e}")
             raise
     
     async def get_klines(
@@ -379,56 +649,89 @@ class HyperliquidToolkit(BaseDEXToolkit):
             hl_interval = interval
             
             # Calculate time range
-            end_time = int(time.time() * 1000)
+            end_time = time.time_ns() // 1_000_000
             # Estimate start time based on interval
-            interval_ms_map = {
-                "1m": 60 * 1000,
-                "3m": 3 * 60 * 1000,
-                "5m": 5 * 60 * 1000,
-                "15m": 15 * 60 * 1000,
-                "1h": 60 * 60 * 1000,
-                "4h": 4 * 60 * 60 * 1000,
-                "1d": 24 * 60 * 60 * 1000,
-            }
-            interval_ms = interval_ms_map.get(hl_interval, 3 * 60 * 1000)
+            interval_ms = INTERVAL_MS.get(hl_interval, INTERVAL_MS["3m"])
             start_time = end_time - (interval_ms * limit)
             
-            candles = self.info.candles_snapshot(normalized, hl_interval, start_time, end_time)
+            candles = await asyncio.to_thread(
+                self.info.candles_snapshot, normalized, hl_interval, start_time, end_time
+            )
+            
+            # Hyperliquid returns candles oldest first; only reorder (stably,
+            # by open time) when it does not. Keep the last N candles before
+            # converting, so only returned rows are parsed into dicts.
+            open_times = [c.get("t", c.get("T", 0)) for c in candles]
+            if open_times != sorted(open_times):
+                order = sorted(range(len(candles)), key=open_times.__getitem__)
+                candles = [candles[i] for i in order]
+                open_times = [open_times[i] for i in order]
+            if len(candles) > limit:
+                candles = candles[-limit:]
+                open_times = open_times[-limit:]
             
             # Convert to standardized format
             klines = []
-            for candle in candles:
-                klines.append({
-                    "open_time": candle.get("t", candle.get("T", 0)),
-                    "open": float(candle.get("o", "0")),
-                    "high": float(candle.get("h", "0")),
-                    "low": float(candle.get("l", "0")),
-                    "close": float(candle.get("c", "0")),
-                    "volume": float(candle.get("v", "0")),
-                    "close_time": candle.get("t", candle.get("T", 0)) + interval_ms - 1,
+            append = klines.append
+            for candle, open_time in zip(candles, open_times):
+                get = candle.get
+                append({
+                    "open_time": open_time,
+                    "open": float(get("o", "0")),
+                    "high": float(get("h", "0")),
+                    "low": float(get("l", "0")),
+                    "close": float(get("c", "0")),
+                    "volume": float(get("v", "0")),
+                    "close_time": open_time + interval_ms - 1,
                 })
             
-            # Sort by time (oldest first)
-            klines.sort(key=lambda x: x["open_time"])
-            
-            # Return last N candles
-            return klines[-limit:] if len(klines) > limit else klines
+            return klines
             
         except Exception as e:
-            logger.error(f"Failed to get klines for {symbol}: {e}", exc_info=True)
+            logger.error(f"Failed to get klines for {symbol}: {e}")
             raise
     
+    async def _position_leverage(self, coin: str) -> Optional[Tuple[str, int]]:
+        """(margin type, leverage) of the account's open position in a coin, if any."""
+        user_state = await self._user_state()
+        for asset_pos in user_state.get("assetPositions", []):
+            pos = asset_pos.get("position", {})
+            if pos.get("coin") == coin and float(pos.get("szi", "0")) != 0:
+                lev = pos.get("leverage", {})
+                return lev.get("type"), int(float(lev.get("value", "0")))
+        return None
+    
     async def _set_leverage(self, symbol: str, leverage: int) -> None:
-        """Set leverage for a symbol."""
-        try:
-            normalized = self._normalize_symbol(symbol)
-            # Hyperliquid uses update_leverage method
-            # Note: This might need to be implemented based on SDK version
-            # For now, leverage is set per-order in Hyperliquid
-            # TODO: Implement leverage setting per order
-            logger.debug(f"Leverage {leverage}x for {symbol} will be set per order")
-        except Exception as e:
-            logger.warning(f"Failed to set leverage for {symbol}: {e}")
+        """
+        Set cross-margin leverage for a symbol.
+        
+        Skipped when the account's open position in the coin already runs at
+        that cross leverage, so re-entries cost no signed request. The check
+        reads exchange state rather than a local memo, because other agents on
+        the same account (or the web UI) may change leverage at any time.
+        Failures are logged and the existing leverage is used.
+        """
+        normalized = self._normalize_symbol(symbol)
+        
+        # Serializes updates per coin so concurrent entries do not race
+        async with self._leverage_locks[normalized]:
+            try:
+                if await self._position_leverage(normalized) == ("cross", leverage):
+                    return
+            except Exception as e:
+                logger.debug(f"Could not read position leverage for {symbol}: {e}")
+            try:
+                leverage_result = await asyncio.to_thread(
+                    self.exchange.update_leverage, leverage, normalized, is_cross=True
+                )
+            except Exception as e:
+                logger.warning(f"Could not set leverage for {symbol}: {e}. Using existing leverage.")
+                return
+            if leverage_result.get("status") != "ok":
+                logger.warning(f"Failed to set leverage for {symbol}: {leverage_result}")
+                return
+            self._invalidate_user_state()
+            logger.debug(f"Set leverage to {leverage}x for {symbol}")
     
     async def place_take_profit_stop_loss(
         self,
@@ -459,10 +762,10 @@ class HyperliquidToolkit(BaseDEXToolkit):
             trigger_px: float,
             is_buy: bool,
             tpsl: str,
-        ) -> None:
+        ) -> Optional[Dict]:
             if trigger_px <= 0:
                 logger.warning(f"Skipping {label} for {symbol}: trigger price non-positive")
-                return
+                return None
 
             formatted_px = self._format_price(symbol, trigger_px)
             order_result = self.exchange.order(
@@ -479,161 +782,69 @@ class HyperliquidToolkit(BaseDEXToolkit):
                 },
                 reduce_only=True,
             )
-            results[label] = order_result
             logger.info(
                 f"Placed {label} for {symbol} {side}: triggerPx={formatted_px}, quantity={formatted_qty}"
             )
+            return order_result
 
+        # Closing orders sell a long and buy back a short
+        is_buy = side != "long"
+        sign = -1 if is_buy else 1
+        triggers = []
         if take_profit_pct and take_profit_pct > 0:
-            if side == "long":
-                tp_price = entry_price * (1 + take_profit_pct / 100)
-                _place_trigger("take_profit", tp_price, is_buy=False, tpsl="tp")
-            else:
-                tp_price = entry_price * (1 - take_profit_pct / 100)
-                _place_trigger("take_profit", tp_price, is_buy=True, tpsl="tp")
-
+            tp_price = entry_price * (1 + sign * take_profit_pct / 100)
+            triggers.append(("take_profit", tp_price, "tp"))
         if stop_loss_pct and stop_loss_pct > 0:
-            if side == "long":
-                sl_price = entry_price * (1 - stop_loss_pct / 100)
-                _place_trigger("stop_loss", sl_price, is_buy=False, tpsl="sl")
-            else:
-                sl_price = entry_price * (1 + stop_loss_pct / 100)
-                _place_trigger("stop_loss", sl_price, is_buy=True, tpsl="sl")
+            sl_price = entry_price * (1 - sign * stop_loss_pct / 100)
+            triggers.append(("stop_loss", sl_price, "sl"))
+
+        # Submit the triggers one after the other: the SDK signs each action with
+        # a millisecond timestamp nonce, so parallel submissions can collide and
+        # one of them would be rejected as a duplicate
+        for label, trigger_px, tpsl in triggers:
+            order_result = await asyncio.to_thread(_place_trigger, label, trigger_px, is_buy, tpsl)
+            if order_result is not None:
+                results[label] = order_result
+        if triggers:
+            self._invalidate_user_state()
 
         return results
 
     async def open_long(self, symbol: str, quantity: float, leverage: int) -> Dict:
         """Open a long position."""
-        try:
-            normalized = self._normalize_symbol(symbol)
-            
-            # Set leverage before placing order (cross margin mode)
-            try:
-                leverage_result = self.exchange.update_leverage(leverage, normalized, is_cross=True)
-                if leverage_result.get("status") != "ok":
-                    logger.warning(f"Failed to set leverage for {symbol}: {leverage_result}")
-                else:
-                    logger.debug(f"Set leverage to {leverage}x for {symbol}")
-            except Exception as e:
-                logger.warning(f"Could not set leverage for {symbol}: {e}. Using existing leverage.")
-            
-            # Get current price
-            price = await self.get_market_price(symbol)
-            
-            # Use limit order at slightly higher price to ensure fill
-            limit_price_raw = price * 1.01
-            
-            # Format price according to Hyperliquid rules
-            limit_price = self._format_price(symbol, limit_price_raw)
-            
-            # Format quantity to precision
-            precision = self._get_precision(symbol)
-            formatted_qty = round(quantity, precision)
-            
-            # Validate minimum order size
-            # Hyperliquid typically requires minimum order value of $1 USD
-            min_order_value = formatted_qty * limit_price
-            if min_order_value < 1.0:
-                logger.warning(
-                    f"Order value ${min_order_value:.2f} is below minimum $1. "
-                    f"Increasing quantity to meet minimum..."
-                )
-                # Increase to minimum $1 order value
-                formatted_qty = max(formatted_qty, round(1.0 / limit_price, precision))
-                min_order_value = formatted_qty * limit_price
-                logger.info(f"Adjusted quantity to {formatted_qty} (value: ${min_order_value:.2f})")
-            
-            logger.info(
-                f"Opening LONG {symbol} ({normalized}): "
-                f"quantity={formatted_qty}, price={limit_price}, leverage={leverage}x, "
-                f"order_value=${formatted_qty * limit_price:.2f}, precision={precision}"
-            )
-            
-            # Place order (is_buy=True for long)
-            # Order type: limit with GTC (Good Till Cancel)
-            order_result = self.exchange.order(
-                normalized,
-                is_buy=True,
-                sz=formatted_qty,
-                limit_px=limit_price,
-                order_type={"limit": {"tif": "Gtc"}}
-            )
-            
-            # Parse response
-            logger.debug(f"Order result: {order_result}")
-            
-            if order_result.get("status") == "ok":
-                response_data = order_result.get("response", {}).get("data", {})
-                statuses = response_data.get("statuses", [])
-                if statuses:
-                    status = statuses[0]
-                    if "resting" in status:
-                        oid = status["resting"].get("oid")
-                        return {
-                            "order_id": oid,
-                            "symbol": symbol,
-                            "side": "long",
-                            "quantity": str(formatted_qty),
-                            "price": str(limit_price),
-                            "status": "resting",
-                        }
-                    elif "filled" in status:
-                        return {
-                            "order_id": None,
-                            "symbol": symbol,
-                            "side": "long",
-                            "quantity": str(formatted_qty),
-                            "price": str(limit_price),
-                            "status": "filled",
-                        }
-                    elif "error" in status:
-                        error_info = status["error"]
-                        error_msg = error_info if isinstance(error_info, str) else str(error_info)
-                        logger.error(f"Order error in status: {error_info}")
-                        raise Exception(f"Order failed: {error_msg}")
-            
-            # Error case - try to extract error message from various locations
-            error_msg = None
-            if "response" in order_result:
-                response = order_result["response"]
-                if isinstance(response, dict):
-                    error_msg = (
-                        response.get("error") or 
-                        response.get("data", {}).get("error") or
-                        str(response)
-                    )
-            
-            if not error_msg:
-                error_msg = f"Unknown error. Full response: {order_result}"
-            
-            logger.error(f"Order failed for {symbol}: {error_msg}")
-            logger.error(f"Order parameters: symbol={normalized}, is_buy=True, sz={formatted_qty}, limit_px={limit_price}, leverage={leverage}")
-            raise Exception(f"Order failed: {error_msg}")
-            
-        except Exception as e:
-            logger.error(f"Failed to open long position for {symbol}: {e}", exc_info=True)
-            raise
+        return await self._open(symbol, quantity, leverage, "long")
     
     async def open_short(self, symbol: str, quantity: float, leverage: int) -> Dict:
         """Open a short position."""
+        return await self._open(symbol, quantity, leverage, "short")
+    
+    async def _open(self, symbol: str, quantity: float, leverage: int, side: str) -> Dict:
+        """
+        Open a position with a marketable GTC limit order.
+        
+        Args:
+            symbol: Trading pair (internal format)
+            quantity: Order size in base asset
+            leverage: Leverage to set (cross margin) before ordering
+            side: "long" (buy above mid) or "short" (sell below mid)
+        
+        Returns:
+            Normalized order result
+        """
+        is_buy = side == "long"
         try:
             normalized = self._normalize_symbol(symbol)
             
-            # Set leverage before placing order (cross margin mode)
-            try:
-                leverage_result = self.exchange.update_leverage(leverage, normalized, is_cross=True)
-                if leverage_result.get("status") != "ok":
-                    logger.warning(f"Failed to set leverage for {symbol}: {leverage_result}")
-                else:
-                    logger.debug(f"Set leverage to {leverage}x for {symbol}")
-            except Exception as e:
-                logger.warning(f"Could not set leverage for {symbol}: {e}. Using existing leverage.")
-            
-            # Get current price
-            price = await self.get_market_price(symbol)
+            # Set leverage (cross margin mode) and fetch the price concurrently;
+            # a failed leverage update is not fatal, a missing price is
+            _, price, _ = await asyncio.gather(
+                self._set_leverage(symbol, leverage),
+                self.get_market_price(symbol),
+                self._refresh_meta(),
+            )
             
-            # Use limit order at slightly lower price
-            limit_price_raw = price * 0.99
+            # Use limit order slightly through the mid to ensure fill
+            limit_price_raw = price * (1.01 if is_buy else 0.99)
             
             # Format price according to Hyperliquid rules
             limit_price = self._format_price(symbol, limit_price_raw)
@@ -656,22 +867,25 @@ class HyperliquidToolkit(BaseDEXToolkit):
                 logger.info(f"Adjusted quantity to {formatted_qty} (value: ${min_order_value:.2f})")
             
             logger.info(
-                f"Opening SHORT {symbol} ({normalized}): "
+                f"Opening {side.upper()} {symbol} ({normalized}): "
                 f"quantity={formatted_qty}, price={limit_price}, leverage={leverage}x, "
                 f"order_value=${formatted_qty * limit_price:.2f}, precision={precision}"
             )
             
-            # Place order (is_buy=False for short)
-            order_result = self.exchange.order(
+            # Place order (is_buy=True for long, False for short)
+            # Order type: limit with GTC (Good Till Cancel)
+            order_result = await asyncio.to_thread(
+                self.exchange.order,
                 normalized,
-                is_buy=False,
+                is_buy=is_buy,
                 sz=formatted_qty,
                 limit_px=limit_price,
                 order_type={"limit": {"tif": "Gtc"}}
             )
+            self._invalidate_user_state()
             
             # Parse response
-            logger.debug(f"Order result: {order_result}")
+            logger.opt(lazy=True).debug("Order result: {}", lambda: order_result)
             
             if order_result.get("status") == "ok":
                 response_data = order_result.get("response", {}).get("data", {})
@@ -683,7 +897,7 @@ class HyperliquidToolkit(BaseDEXToolkit):
                         return {
                             "order_id": oid,
                             "symbol": symbol,
-                            "side": "short",
+                            "side": side,
                             "quantity": str(formatted_qty),
                             "price": str(limit_price),
                             "status": "resting",
@@ -692,7 +906,7 @@ class HyperliquidToolkit(BaseDEXToolkit):
                         return {
                             "order_id": None,
                             "symbol": symbol,
-                            "side": "short",
+                            "side": side,
                             "quantity": str(formatted_qty),
                             "price": str(limit_price),
                             "status": "filled",
@@ -718,11 +932,11 @@ class HyperliquidToolkit(BaseDEXToolkit):
                 error_msg = f"Unknown error. Full response: {order_result}"
             
             logger.error(f"Order failed for {symbol}: {error_msg}")
-            logger.error(f"Order parameters: symbol={normalized}, is_buy=False, sz={formatted_qty}, limit_px={limit_price}, leverage={leverage}")
+            logger.error(f"Order parameters: symbol={normalized}, is_buy={is_buy}, sz={formatted_qty}, limit_px={limit_price}, leverage={leverage}")
             raise Exception(f"Order failed: {error_msg}")
             
         except Exception as e:
-            logger.error(f"Failed to open short position for {symbol}: {e}", exc_info=True)
+            logger.error(f"Failed to open {side} position for {symbol}: {e}")
             raise
     
     async def close_position(self, symbol: str, side: str, quantity: float | None = None) -> Dict:
@@ -740,8 +954,10 @@ class HyperliquidToolkit(BaseDEXToolkit):
             
             normalized = self._normalize_symbol(symbol)
             position_amt = position["position_amt"]
-            target_qty = position_amt if quantity is None else min(abs(quantity), position_amt)
-            if target_qty <= 0:
+            # Fully closed exactly when the whole position amount is targeted
+            fully_closed = quantity is None or abs(quantity) >= position_amt
+            target_qty = position_amt if fully_closed else abs(quantity)
+            if math.isnan(target_qty) or target_qty <= 0:
                 raise ValueError("Close quantity must be positive")
             price = await self.get_market_price(symbol)
             
@@ -761,7 +977,8 @@ class HyperliquidToolkit(BaseDEXToolkit):
             logger.info(f"Closing {side.upper()} {symbol}: quantity={formatted_qty}")
             
             # Place reduce-only order
-            order_result = self.exchange.order(
+            order_result = await asyncio.to_thread(
+                self.exchange.order,
                 normalized,
                 is_buy=is_buy,
                 sz=formatted_qty,
@@ -769,6 +986,7 @@ class HyperliquidToolkit(BaseDEXToolkit):
                 order_type={"limit": {"tif": "Gtc"}},
                 reduce_only=True
             )
+            self._invalidate_user_state()
             
             # Parse response
             if order_result.get("status") == "ok":
@@ -784,7 +1002,7 @@ class HyperliquidToolkit(BaseDEXToolkit):
                             "closed_side": side,
                             "quantity": str(formatted_qty),
                             "closed_quantity": formatted_qty,
-                            "fully_closed": abs(target_qty - position_amt) < 1e-9,
+                            "fully_closed": fully_closed,
                             "status": "resting",
                         }
                     elif "filled" in status:
@@ -794,7 +1012,7 @@ class HyperliquidToolkit(BaseDEXToolkit):
                             "closed_side": side,
                             "quantity": str(formatted_qty),
                             "closed_quantity": formatted_qty,
-                            "fully_closed": abs(target_qty - position_amt) < 1e-9,
+                            "fully_closed": fully_closed,
                             "status": "filled",
                         }
             
@@ -803,16 +1021,19 @@ class HyperliquidToolkit(BaseDEXToolkit):
             raise Exception(f"Close order failed: {error_msg}")
             
         except Exception as e:
-            logger.error(f"Failed to close position for {symbol}: {e}", exc_info=True)
+            logger.error(f"Failed to close position for {symbol}: {e}")
             raise
     
     async def close(self):
         """Close HTTP client and cleanup."""
         # Hyperliquid SDK doesn't require explicit cleanup
         # but we can disconnect websocket if needed
+        # No reconnects once closed
+        self._ws_base_url = None
         try:
-            if hasattr(self.info, 'disconnect_websocket'):
-                self.info.disconnect_websocket()
+            if self._ws is not None:
+                self._ws.stop()
+                self._ws = None
         except Exception:
             pass
         logger.info("HyperliquidToolkit closed")
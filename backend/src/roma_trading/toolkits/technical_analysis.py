@@ -4,14 +4,61 @@ Technical Analysis Toolkit using TA-Lib.
 Provides technical indicators for market analysis: MACD, RSI, EMA, ATR, etc.
 """
 
+import math
+from operator import itemgetter
+
 import numpy as np
 import talib
 from typing import List, Dict, Optional
 from loguru import logger
 
 
+# Kline fields consumed by analyze_klines, extracted in one pass per call
+_HLCV_DTYPE = np.dtype([("high", "f8"), ("low", "f8"), ("close", "f8"), ("volume", "f8")])
+_get_hlcv = itemgetter("high", "low", "close", "volume")
+
+
+# Line templates for format_market_data, per prompt language (%-style, the
+# cheapest float formatting in CPython)
+_MARKET_DATA_TEMPLATES = {
+    "en": {
+        "price": "Price: $%.4f",
+        "change_1h": "1h: %+.2f%%",
+        "rsi_3m": "RSI(7): %.1f",
+        "macd": "MACD: %.4f",
+        "ema20": "EMA20: $%.4f",
+        "volume": "Volume: %.2fx avg",
+        "trend_4h": "\n4h Trend: %+.2f%%",
+        "rsi_4h": "RSI(14): %.1f",
+        "ema50": "EMA50: $%.4f",
+    },
+    "zh": {
+        "price": "价格：$%.4f",
+        "change_1h": "1 小时涨跌：%+.2f%%",
+        "rsi_3m": "RSI(7)：%.1f",
+        "macd": "MACD：%.4f",
+        "ema20": "EMA20：$%.4f",
+        "volume": "成交量：%.2f 倍均量",
+        "trend_4h": "\n4 小时趋势：%+.2f%%",
+        "rsi_4h": "RSI(14)：%.1f",
+        "ema50": "EMA50：$%.4f",
+    },
+}
+
+
+def _last(values: np.ndarray, default: float) -> float:
+    """Last value of an indicator series, or default while it is still NaN."""
+    value = float(values[-1])
+    return default if math.isnan(value) else value
+
+
 class TechnicalAnalysisToolkit:
-    """Technical analysis toolkit for crypto market analysis."""
+    """
+    Technical analysis toolkit for crypto market analysis.
+    
+    The calculate_* helpers accept lists or arrays; float64 ndarrays are
+    passed to TA-Lib without a copy, so prefer them when calling repeatedly.
+    """
 
     @staticmethod
     def calculate_macd(prices: List[float], fast: int = 12, slow: int = 26, signal: int = 9) -> Dict:
@@ -19,7 +66,7 @@ class TechnicalAnalysisToolkit:
         Calculate MACD indicator.
         
         Args:
-            prices: List of closing prices
+            prices: Closing prices (list or float64 ndarray)
             fast: Fast EMA period
             slow: Slow EMA period
             signal: Signal line period
@@ -27,15 +74,15 @@ class TechnicalAnalysisToolkit:
         Returns:
             Dict with macd, signal, histogram values
         """
-        prices_array = np.array(prices, dtype=float)
+        prices_array = np.asarray(prices, dtype=np.float64)
         macd, signal_line, histogram = talib.MACD(
             prices_array, fastperiod=fast, slowperiod=slow, signalperiod=signal
         )
         
         return {
-            "macd": float(macd[-1]) if not np.isnan(macd[-1]) else 0.0,
-            "signal": float(signal_line[-1]) if not np.isnan(signal_line[-1]) else 0.0,
-            "histogram": float(histogram[-1]) if not np.isnan(histogram[-1]) else 0.0,
+            "macd": _last(macd, 0.0),
+            "signal": _last(signal_line, 0.0),
+            "histogram": _last(histogram, 0.0),
         }
 
     @staticmethod
@@ -44,15 +91,15 @@ class TechnicalAnalysisToolkit:
         Calculate RSI indicator.
         
         Args:
-            prices: List of closing prices
+            prices: Closing prices (list or float64 ndarray)
             period: RSI period
             
         Returns:
             RSI value (0-100)
         """
-        prices_array = np.array(prices, dtype=float)
+        prices_array = np.asarray(prices, dtype=np.float64)
         rsi = talib.RSI(prices_array, timeperiod=period)
-        return float(rsi[-1]) if not np.isnan(rsi[-1]) else 50.0
+        return _last(rsi, 50.0)
 
     @staticmethod
     def calculate_ema(prices: List[float], period: int = 20) -> float:
@@ -60,15 +107,15 @@ class TechnicalAnalysisToolkit:
         Calculate EMA (Exponential Moving Average).
         
         Args:
-            prices: List of closing prices
+            prices: Closing prices (list or float64 ndarray)
             period: EMA period
             
         Returns:
             EMA value
         """
-        prices_array = np.array(prices, dtype=float)
+        prices_array = np.asarray(prices, dtype=np.float64)
         ema = talib.EMA(prices_array, timeperiod=period)
-        return float(ema[-1]) if not np.isnan(ema[-1]) else 0.0
+        return _last(ema, 0.0)
 
     @staticmethod
     def calculate_atr(
@@ -78,20 +125,20 @@ class TechnicalAnalysisToolkit:
         Calculate ATR (Average True Range).
         
         Args:
-            highs: List of high prices
-            lows: List of low prices
-            closes: List of closing prices
+            highs: High prices (list or float64 ndarray)
+            lows: Low prices (list or float64 ndarray)
+            closes: Closing prices (list or float64 ndarray)
             period: ATR period
             
         Returns:
             ATR value
         """
-        highs_array = np.array(highs, dtype=float)
-        lows_array = np.array(lows, dtype=float)
-        closes_array = np.array(closes, dtype=float)
+        highs_array = np.asarray(highs, dtype=np.float64)
+        lows_array = np.asarray(lows, dtype=np.float64)
+        closes_array = np.asarray(closes, dtype=np.float64)
         
         atr = talib.ATR(highs_array, lows_array, closes_array, timeperiod=period)
-        return float(atr[-1]) if not np.isnan(atr[-1]) else 0.0
+        return _last(atr, 0.0)
 
     @classmethod
     def analyze_klines(cls, klines: List[Dict], interval: str = "3m") -> Dict:
@@ -109,22 +156,19 @@ class TechnicalAnalysisToolkit:
             logger.warning(f"Insufficient kline data: {len(klines)} candles")
             return cls._empty_analysis()
         
-        # Extract price data
-        opens = [k["open"] for k in klines]
-        highs = [k["high"] for k in klines]
-        lows = [k["low"] for k in klines]
-        closes = [k["close"] for k in klines]
-        volumes = [k["volume"] for k in klines]
-        
-        closes_array = np.array(closes, dtype=float)
-        volumes_array = np.array(volumes, dtype=float)
+        # Extract price data in a single pass; closes feed every indicator, so
+        # they get a contiguous copy while the other columns stay field views
+        hlcv = np.fromiter(map(_get_hlcv, klines), dtype=_HLCV_DTYPE, count=len(klines))
+        highs, lows, volumes = hlcv["high"], hlcv["low"], hlcv["volume"]
+        closes = np.ascontiguousarray(hlcv["close"])
+        last_close = float(closes[-1])
         
         # Calculate indicators based on interval
         rsi_period = 7 if interval == "3m" else 14
         
         # Price changes
-        price_change_1h = ((closes[-1] - closes[-20]) / closes[-20] * 100) if len(closes) >= 20 else 0.0
-        price_change_4h = ((closes[-1] - closes[-80]) / closes[-80] * 100) if len(closes) >= 80 else 0.0
+        price_change_1h = ((last_close - closes[-20]) / closes[-20] * 100).item() if len(closes) >= 20 else 0.0
+        price_change_4h = ((last_close - closes[-80]) / closes[-80] * 100).item() if len(closes) >= 80 else 0.0
         
         # MACD
         macd_data = cls.calculate_macd(closes)
@@ -140,11 +184,13 @@ class TechnicalAnalysisToolkit:
         atr = cls.calculate_atr(highs, lows, closes)
         
         # Volume analysis
-        volume_avg = float(np.mean(volumes_array[-20:])) if len(volumes) >= 20 else 0.0
-        volume_ratio = (volumes[-1] / volume_avg) if volume_avg > 0 else 1.0
+        last_volume = float(volumes[-1])
+        # np.add.reduce is the sum np.mean performs, minus its dispatch overhead
+        volume_avg = float(np.add.reduce(volumes[-20:])) / 20 if len(volumes) >= 20 else 0.0
+        volume_ratio = (last_volume / volume_avg) if volume_avg > 0 else 1.0
         
         return {
-            "current_price": float(closes[-1]),
+            "current_price": last_close,
             "price_change_1h": price_change_1h,
             "price_change_4h": price_change_4h,
             "macd": macd_data,
@@ -152,7 +198,7 @@ class TechnicalAnalysisToolkit:
             "ema20": ema20,
             "ema50": ema50,
             "atr": atr,
-            "volume": float(volumes[-1]),
+            "volume": last_volume,
             "volume_avg": volume_avg,
             "volume_ratio": volume_ratio,
             "interval": interval,
@@ -190,62 +236,39 @@ class TechnicalAnalysisToolkit:
             symbol: Trading pair
             data_3m: 3-minute analysis data
             data_4h: 4-hour analysis data (optional)
+            language: Prompt language ("zh" for Chinese, anything else English)
             
         Returns:
             Formatted string for AI consumption
         """
-        lines = [f"**{symbol}**"]
+        templates = _MARKET_DATA_TEMPLATES["zh" if language == "zh" else "en"]
+        lines = [
+            f"**{symbol}**",
+            templates["price"] % data_3m['current_price'],
+        ]
         
-        if language == "zh":
-            lines.append(f"价格：${data_3m['current_price']:.4f}")
-            
-            if data_3m['price_change_1h'] != 0:
-                lines.append(f"1 小时涨跌：{data_3m['price_change_1h']:+.2f}%")
-            
-            lines.append(f"RSI(7)：{data_3m['rsi']:.1f}")
-            lines.append(f"MACD：{data_3m['macd']['macd']:.4f}")
-            lines.append(f"EMA20：${data_3m['ema20']:.4f}")
-            
-            volume_ratio = data_3m.get('volume_ratio', 1.0)
-            if volume_ratio > 1.5:
-                lines.append(f"成交量：{volume_ratio:.2f} 倍均量 ⬆")
-            elif volume_ratio > 1.0:
-                lines.append(f"成交量：{volume_ratio:.2f} 倍均量 ↗")
-            elif volume_ratio < 0.5:
-                lines.append(f"成交量：{volume_ratio:.2f} 倍均量 ⬇")
-            else:
-                lines.append(f"成交量：{volume_ratio:.2f} 倍均量")
-            
-            if data_4h:
-                lines.append(f"\n4 小时趋势：{data_4h['price_change_4h']:+.2f}%")
-                lines.append(f"RSI(14)：{data_4h['rsi']:.1f}")
-                if data_4h.get('ema50'):
-                    lines.append(f"EMA50：${data_4h['ema50']:.4f}")
-        else:
-            lines.append(f"Price: ${data_3m['current_price']:.4f}")
-            
-            if data_3m['price_change_1h'] != 0:
-                lines.append(f"1h: {data_3m['price_change_1h']:+.2f}%")
-            
-            lines.append(f"RSI(7): {data_3m['rsi']:.1f}")
-            lines.append(f"MACD: {data_3m['macd']['macd']:.4f}")
-            lines.append(f"EMA20: ${data_3m['ema20']:.4f}")
-            
-            volume_ratio = data_3m.get('volume_ratio', 1.0)
-            if volume_ratio > 1.5:
-                lines.append(f"Volume: {volume_ratio:.2f}x avg ⬆")
-            elif volume_ratio > 1.0:
-                lines.append(f"Volume: {volume_ratio:.2f}x avg ↗")
-            elif volume_ratio < 0.5:
-                lines.append(f"Volume: {volume_ratio:.2f}x avg ⬇")
-            else:
-                lines.append(f"Volume: {volume_ratio:.2f}x avg")
-            
-            if data_4h:
-                lines.append(f"\n4h Trend: {data_4h['price_change_4h']:+.2f}%")
-                lines.append(f"RSI(14): {data_4h['rsi']:.1f}")
-                if data_4h.get('ema50'):
-                    lines.append(f"EMA50: ${data_4h['ema50']:.4f}")
+        if data_3m['price_change_1h'] != 0:
+            lines.append(templates["change_1h"] % data_3m['price_change_1h'])
+        
+        lines.append(templates["rsi_3m"] % data_3m['rsi'])
+        lines.append(templates["macd"] % data_3m['macd']['macd'])
+        lines.append(templates["ema20"] % data_3m['ema20'])
+        
+        volume_ratio = data_3m.get('volume_ratio', 1.0)
+        volume_line = templates["volume"] % volume_ratio
+        if volume_ratio > 1.5:
+            volume_line += " ⬆"
+        elif volume_ratio > 1.0:
+            volume_line += " ↗"
+        elif volume_ratio < 0.5:
+            volume_line += " ⬇"
+        lines.append(volume_line)
+        
+        if data_4h:
+            lines.append(templates["trend_4h"] % data_4h['price_change_4h'])
+            lines.append(templates["rsi_4h"] % data_4h['rsi'])
+            if data_4h.get('ema50'):
+                lines.append(templates["ema50"] % data_4h['ema50'])
         
         return "\n".join(lines)
 